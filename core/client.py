@@ -2,18 +2,37 @@
 ShowDoc 客户端主类
 """
 import json
+import logging
 import os
 import re
 import time
+from collections import defaultdict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List
 
 import requests
 from requests.adapters import HTTPAdapter
 from requests.utils import cookiejar_from_dict
 from urllib3.util.retry import Retry
 
+# 尝试导入 httpx（可选，创建客户端时指定 use_httpx=True 才使用，支持 HTTP/2 多路复用）
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    httpx = None
+    HAS_HTTPX = False
+
+# HTTP/2 需要 h2 包（pip install httpx[http2]）
+try:
+    import h2  # noqa: F401
+    HAS_HTTP2 = HAS_HTTPX
+except ImportError:
+    HAS_HTTP2 = False
+
 from .exceptions import (
     ShowDocError,
     ShowDocAuthError,
@@ -39,11 +58,102 @@ from .models import (
     ApiTree
 )
 
+logger = logging.getLogger(__name__)
+
+# 页面详情并发获取的批大小（同时也是连接池大小）
+PAGE_FETCH_BATCH_SIZE = 16
+
+# POST 请求的请求头（所有 POST 请求都是表单编码；不放进 session 默认请求头，否则 GET 请求也会带上）
+_FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+# 按状态码重试的设置（与 requests 后端的 urllib3 Retry 一致）
+_RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+_RETRY_TOTAL = 3
+_RETRY_BACKOFF_FACTOR = 1
+
+# 两种 HTTP 后端的超时/连接异常
+_TIMEOUT_ERRORS: tuple = (requests.exceptions.Timeout,)
+_CONNECTION_ERRORS: tuple = (requests.exceptions.ConnectionError,)
+if HAS_HTTPX:
+    _TIMEOUT_ERRORS += (httpx.TimeoutException,)
+    _CONNECTION_ERRORS += (httpx.TransportError,)
+
+
+def _as_str(value: Any) -> str:
+    """转换为字符串，已经是字符串时直接返回"""
+    return value if isinstance(value, str) else str(value)
+
+
+def _decode_page_content_or_text(encoded_content: str) -> Dict[str, Any]:
+    """
+    解码 page_content，非 JSON 内容按 Markdown/纯文本保存
+    
+    Args:
+        encoded_content: 接口返回的原始 page_content
+    
+    Returns:
+        解码后的内容字典
+    """
+    try:
+        # 尝试解析为 JSON（API 类型页面）
+        return decode_page_content(encoded_content)
+    except (ShowDocParseError, json.JSONDecodeError, ValueError):
+        # 如果不是 JSON 格式（可能是 Markdown 文本），直接保存原始内容
+        # 这种情况通常是普通文档页面，不是 API 类型
+        import html
+        try:
+            # 尝试 HTML 实体解码
+            decoded_text = html.unescape(encoded_content) if "&" in encoded_content else encoded_content
+            return {
+                "type": "markdown",
+                "content": decoded_text,
+                "raw": encoded_content
+            }
+        except Exception:
+            # 如果解码也失败，保存原始内容
+            return {
+                "type": "text",
+                "content": encoded_content,
+                "raw": encoded_content
+            }
+
+
+class _LazyDecoded(Mapping):
+    """
+    延迟解码的 page_content，首次访问内容时才解码，结果会被缓存
+    
+    实现了 Mapping 接口，可以像解码后的字典一样读取（page_data["decoded_content"]["info"]、
+    .get()、遍历等）；需要真正的 dict（如序列化为 JSON）时调用 value()。
+    """
+    
+    __slots__ = ("_raw", "_val")
+    
+    def __init__(self, raw: str):
+        self._raw = raw
+        self._val: Optional[Dict[str, Any]] = None
+    
+    def value(self) -> Dict[str, Any]:
+        if self._val is None:
+            self._val = _decode_page_content_or_text(self._raw)
+        return self._val
+    
+    def __getitem__(self, key: str) -> Any:
+        return self.value()[key]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.value())
+    
+    def __len__(self) -> int:
+        return len(self.value())
+    
+    def __repr__(self) -> str:
+        return repr(self.value())
+
 
 class ShowDocClient:
     """ShowDoc 客户端类，用于获取接口文档数据"""
     
-    def __init__(self, base_url: str, cookie: Optional[str] = None, password: Optional[str] = "123456", verify_ssl: bool = False):
+    def __init__(self, base_url: str, cookie: Optional[str] = None, password: Optional[str] = "123456", verify_ssl: bool = False, use_httpx: bool = False):
         """
         初始化 ShowDoc 客户端
         
@@ -52,7 +162,15 @@ class ShowDocClient:
             cookie: 认证 Cookie，例如 "think_language=zh-CN; PHPSESSID=xxx"（可选）
             password: 项目访问密码，如果提供且 cookie 为空，将自动进行密码登录（默认: "123456"）
             verify_ssl: 是否验证 SSL 证书（默认: False，因为很多服务器使用自签名证书）
+            use_httpx: 是否使用 httpx 发送请求（需安装 httpx[http2]，批量获取页面时
+                所有并发请求复用同一条 HTTP/2 连接；默认: False，使用 requests）
+        
+        Raises:
+            ShowDocError: 指定 use_httpx=True 但未安装 httpx
         """
+        if use_httpx and not HAS_HTTPX:
+            raise ShowDocError("未安装 httpx，请运行: pip install httpx[http2]")
+        self._use_httpx = use_httpx
         # 解析 URL，提取服务器地址和 item_id
         url_info = parse_showdoc_url(base_url)
         self.server_base = url_info["server_base"]
@@ -61,42 +179,76 @@ class ShowDocClient:
         # 保存 password 以便后续自动重新登录
         self._password = password
         
+        # 验证码图片请求序号（用于防缓存参数）
+        self._captcha_seq = 0
+        
+        # 分类名称索引（由 _filter_categories_recursive 按需构建，fetch_item_info 时失效）
+        self._name_index: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._name_index_source: Optional[List[Dict[str, Any]]] = None
+        
         # 初始化 Cookie 管理器
         self.cookie_manager = CookieManager()
         
-        # 初始化 HTTP session
-        self.session = requests.Session()
+        # 保存 SSL 验证设置
+        self.verify_ssl = verify_ssl
         
         # 禁用 SSL 警告（如果禁用了 SSL 验证）
         if not verify_ssl:
             import urllib3
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
         
-        # 配置重试策略
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
-        
-        # 保存 SSL 验证设置
-        self.verify_ssl = verify_ssl
-        
-        # 设置默认请求头
-        self.session.headers.update({
+        # 默认请求头
+        default_headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36",
             "Accept": "application/json, text/plain, */*",
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
             "Accept-Encoding": "gzip, deflate, br",
             "DNT": "1",
-            "Connection": "keep-alive",
             "Sec-Fetch-Site": "same-origin",
             "Sec-Fetch-Mode": "cors",
             "Sec-Fetch-Dest": "empty",
-        })
+        }
+        
+        # 初始化 HTTP session
+        if self._use_httpx:
+            # httpx：启用 HTTP/2 时所有并发请求复用同一条 TLS 连接
+            # 注意：httpx 的 retries 只重试连接失败，按状态码重试由 _make_request 处理
+            limits = httpx.Limits(
+                max_connections=PAGE_FETCH_BATCH_SIZE,
+                max_keepalive_connections=PAGE_FETCH_BATCH_SIZE,
+            )
+            transport = httpx.HTTPTransport(
+                verify=verify_ssl,
+                http2=HAS_HTTP2,
+                limits=limits,
+                retries=3,
+            )
+            # HTTP/2 禁止 Connection 等逐跳请求头，由 httpx 自行管理连接
+            # 与 requests 一致，自动跟随重定向（httpx 默认不跟随）
+            self.session = httpx.Client(
+                transport=transport,
+                headers=default_headers,
+                follow_redirects=True,
+            )
+        else:
+            self.session = requests.Session()
+            
+            # 配置重试策略
+            retry_strategy = Retry(
+                total=_RETRY_TOTAL,
+                backoff_factor=_RETRY_BACKOFF_FACTOR,
+                status_forcelist=sorted(_RETRY_STATUS_CODES),
+            )
+            adapter = HTTPAdapter(
+                max_retries=retry_strategy,
+                pool_connections=PAGE_FETCH_BATCH_SIZE,
+                pool_maxsize=PAGE_FETCH_BATCH_SIZE,
+            )
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+            
+            default_headers["Connection"] = "keep-alive"
+            self.session.headers.update(default_headers)
         
         # Cookie 优先级：参数传入 > 保存的 Cookie > 密码登录
         if cookie:
@@ -125,12 +277,9 @@ class ShowDocClient:
                 print(f"[{datetime.now().strftime('%H:%M:%S')}] 未找到保存的 Cookie，将使用密码登录")
                 self.authenticate_with_password(password)
                 # 登录成功后，从 session 中提取 Cookie 并保存
-                cookies_dict = self.session.cookies.get_dict()
-                cookie_parts = []
-                for key, value in cookies_dict.items():
-                    cookie_parts.append(f"{key}={value}")
-                if cookie_parts:
-                    self.cookie = "; ".join(cookie_parts)
+                cookie_string = self._get_session_cookie_string()
+                if cookie_string:
+                    self.cookie = cookie_string
                     self.session.headers["Cookie"] = self.cookie
                     # 保存 Cookie 以备下次使用
                     print(f"[{datetime.now().strftime('%H:%M:%S')}] 登录成功，保存 Cookie 到本地")
@@ -138,14 +287,27 @@ class ShowDocClient:
             else:
                 raise ShowDocAuthError("必须提供 cookie 或 password 之一进行认证")
     
+    def _get_session_cookie_string(self) -> str:
+        """
+        将 session 中的 Cookie 拼接为 Cookie 请求头字符串
+        
+        Returns:
+            形如 "key1=value1; key2=value2" 的字符串，没有 Cookie 时返回空字符串
+        """
+        # requests 的 CookieJar 本身可迭代；httpx.Cookies 的底层 CookieJar 在 .jar 上
+        jar = getattr(self.session.cookies, "jar", self.session.cookies)
+        cookies_dict = {cookie.name: cookie.value for cookie in jar}
+        return "; ".join(f"{key}={value}" for key, value in cookies_dict.items())
+    
     def _make_request(
         self,
         method: str,
         url: str,
         data: Optional[Dict[str, Any]] = None,
         timeout: int = 30,
-        verify: Optional[bool] = None
-    ) -> requests.Response:
+        verify: Optional[bool] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> "requests.Response | httpx.Response":
         """
         发送 HTTP 请求（内部方法）
         
@@ -154,6 +316,9 @@ class ShowDocClient:
             url: 请求 URL
             data: POST 数据
             timeout: 超时时间（秒）
+            verify: 是否验证 SSL 证书（仅 requests 后端支持按请求设置；httpx 后端
+                在创建客户端时按 verify_ssl 确定，与之不同时抛出异常）
+            headers: 本次请求额外的请求头（与 session 默认请求头合并，不修改 session）
         
         Returns:
             Response 对象
@@ -163,22 +328,41 @@ class ShowDocClient:
             ShowDocAuthError: 认证失败
         """
         try:
-            # 如果没有指定 verify，使用实例的默认设置
-            if verify is None:
-                verify = self.verify_ssl
+            method = method.upper()
+            if method not in ("GET", "POST"):
+                raise ShowDocNetworkError(f"不支持的 HTTP 方法: {method}")
+            if method == "POST":
+                headers = {**_FORM_HEADERS, **headers} if headers else _FORM_HEADERS
             
-            if method.upper() == "GET":
-                response = self.session.get(url, timeout=timeout, verify=verify)
-            elif method.upper() == "POST":
-                response = self.session.post(
+            if self._use_httpx:
+                # httpx 的 SSL 验证在创建 Client 时确定，不能按请求修改
+                if verify is not None and verify != self.verify_ssl:
+                    raise ShowDocNetworkError("httpx 后端不支持按请求设置 verify，请在创建客户端时指定 verify_ssl")
+                # 与 requests 后端的 Retry 一致：429/5xx 时按指数退避重试
+                for attempt in range(_RETRY_TOTAL + 1):
+                    response = self.session.request(
+                        method,
+                        url,
+                        data=data if method == "POST" else None,
+                        headers=headers,
+                        timeout=timeout,
+                    )
+                    if response.status_code not in _RETRY_STATUS_CODES or attempt == _RETRY_TOTAL:
+                        break
+                    response.close()
+                    time.sleep(_RETRY_BACKOFF_FACTOR * (2 ** attempt))
+            else:
+                # 如果没有指定 verify，使用实例的默认设置
+                if verify is None:
+                    verify = self.verify_ssl
+                response = self.session.request(
+                    method,
                     url,
-                    data=data,
-                    headers={"Content-Type": "application/x-www-form-urlencoded"},
+                    data=data if method == "POST" else None,
+                    headers=headers,
                     timeout=timeout,
-                    verify=verify
+                    verify=verify,
                 )
-            else:
-                raise ShowDocNetworkError(f"不支持的 HTTP 方法: {method}")
             
             # 检查 HTTP 状态码
             if response.status_code == 401 or response.status_code == 403:
@@ -191,16 +375,16 @@ class ShowDocClient:
             
             return response
         
-        except requests.exceptions.Timeout:
-            raise ShowDocNetworkError(f"请求超时: {url}")
-        except requests.exceptions.ConnectionError as e:
-            raise ShowDocNetworkError(f"连接失败: {str(e)}")
         except (ShowDocAuthError, ShowDocNetworkError):
             raise
+        except _TIMEOUT_ERRORS:
+            raise ShowDocNetworkError(f"请求超时: {url}")
+        except _CONNECTION_ERRORS as e:
+            raise ShowDocNetworkError(f"连接失败: {str(e)}")
         except Exception as e:
             raise ShowDocNetworkError(f"请求异常: {str(e)}")
     
-    def _parse_json_response(self, response: requests.Response) -> Dict[str, Any]:
+    def _parse_json_response(self, response: "requests.Response | httpx.Response") -> Dict[str, Any]:
         """
         解析 JSON 响应
         
@@ -303,7 +487,9 @@ class ShowDocClient:
                 print(f"[{datetime.now().strftime('%H:%M:%S')}] 步骤2: 开始获取验证码图片")
                 
                 print(f"[{datetime.now().strftime('%H:%M:%S')}]   2.1: 构建验证码图片请求 URL...")
-                show_captcha_url = f"{self.server_base}/server/index.php?s=/api/common/showCaptcha&captcha_id={captcha_id}&{int(time.time() * 1000)}"
+                # 毫秒时间戳 + 自增序号作为防缓存参数，保证每次请求的 URL 唯一
+                self._captcha_seq += 1
+                show_captcha_url = f"{self.server_base}/server/index.php?s=/api/common/showCaptcha&captcha_id={captcha_id}&{time.time_ns() // 1_000_000}_{self._captcha_seq}"
                 
                 print(f"[{datetime.now().strftime('%H:%M:%S')}]   2.2: 发送 GET 请求获取图片...")
                 captcha_response = self._make_request("GET", show_captcha_url)
@@ -349,12 +535,9 @@ class ShowDocClient:
                 if error_code == 0:
                     print(f"[{datetime.now().strftime('%H:%M:%S')}] 步骤4-登录成功！")
                     # 登录成功后，从 session 中提取 Cookie 并保存
-                    cookies_dict = self.session.cookies.get_dict()
-                    cookie_parts = []
-                    for key, value in cookies_dict.items():
-                        cookie_parts.append(f"{key}={value}")
-                    if cookie_parts:
-                        self.cookie = "; ".join(cookie_parts)
+                    cookie_string = self._get_session_cookie_string()
+                    if cookie_string:
+                        self.cookie = cookie_string
                         self.session.headers["Cookie"] = self.cookie
                         # 保存 Cookie 到本地文件，以便下次直接使用
                         print(f"[{datetime.now().strftime('%H:%M:%S')}]   保存登录 Cookie 到本地文件...")
@@ -466,6 +649,10 @@ class ShowDocClient:
         if item_id is None:
             item_id = self.item_id
         
+        # 目录树即将刷新，旧的名称索引失效
+        self._name_index = None
+        self._name_index_source = None
+        
         url = f"{self.server_base}/server/index.php?s=/api/item/info"
         data = {"item_id": item_id}
         
@@ -488,12 +675,9 @@ class ShowDocClient:
                     try:
                         self.authenticate_with_password(self._password)
                         # 重新获取 Cookie
-                        cookies_dict = self.session.cookies.get_dict()
-                        cookie_parts = []
-                        for key, value in cookies_dict.items():
-                            cookie_parts.append(f"{key}={value}")
-                        if cookie_parts:
-                            self.cookie = "; ".join(cookie_parts)
+                        cookie_string = self._get_session_cookie_string()
+                        if cookie_string:
+                            self.cookie = cookie_string
                             self.session.headers["Cookie"] = self.cookie
                             self.cookie_manager.save_cookie(self.server_base, self.item_id, self.cookie)
                         # 重试请求
@@ -543,7 +727,8 @@ class ShowDocClient:
             page_id: 页面 ID
         
         Returns:
-            包含 API 定义的页面数据
+            包含 API 定义的页面数据，其中 decoded_content 延迟解码（可按字典读取，
+            需要 dict 时通过 get_decoded_content 获取）
         
         Raises:
             ShowDocNotFoundError: 页面不存在
@@ -558,7 +743,7 @@ class ShowDocClient:
         # 设置 Referer 和 Origin 头部，模拟浏览器请求
         # 注意：根据实际请求，Origin 应该指向主域名（如 https://www.showdoc.com.cn）
         # Referer 也应该指向主域名
-        original_headers = self.session.headers.copy()
+        # 请求头按请求单独传入，不修改 session，以便多个线程并发获取页面
         
         # 从 server_base 提取主域名（处理 CDN 域名情况）
         from urllib.parse import urlparse
@@ -569,15 +754,13 @@ class ShowDocClient:
             # 尝试从 server_base 推断主域名，或者使用常见的 showdoc.com.cn
             main_domain = "https://www.showdoc.com.cn"
         
-        self.session.headers["Referer"] = f"{main_domain}/"
-        self.session.headers["Origin"] = main_domain
-        self.session.headers["Sec-Fetch-Site"] = "cross-site"  # 跨站请求
+        page_headers = {
+            "Referer": f"{main_domain}/",
+            "Origin": main_domain,
+            "Sec-Fetch-Site": "cross-site",  # 跨站请求
+        }
         
-        try:
-            response = self._make_request("POST", url, data=data)
-        finally:
-            # 恢复原始请求头
-            self.session.headers = original_headers
+        response = self._make_request("POST", url, data=data, headers=page_headers)
         result = self._parse_json_response(response)
         
         # 检查错误码
@@ -594,35 +777,66 @@ class ShowDocClient:
         
         page_data = result.get("data", {})
         
-        # 处理 page_content
+        # 处理 page_content：仅在真正读取时才解码（见 _LazyDecoded）
         if "page_content" in page_data:
-            encoded_content = page_data["page_content"]
-            try:
-                # 尝试解析为 JSON（API 类型页面）
-                decoded_content = decode_page_content(encoded_content)
-                page_data["decoded_content"] = decoded_content
-            except (ShowDocParseError, json.JSONDecodeError, ValueError):
-                # 如果不是 JSON 格式（可能是 Markdown 文本），直接保存原始内容
-                # 这种情况通常是普通文档页面，不是 API 类型
-                import html
-                try:
-                    # 尝试 HTML 实体解码
-                    decoded_text = html.unescape(encoded_content)
-                    page_data["decoded_content"] = {
-                        "type": "markdown",
-                        "content": decoded_text,
-                        "raw": encoded_content
-                    }
-                except Exception:
-                    # 如果解码也失败，保存原始内容
-                    page_data["decoded_content"] = {
-                        "type": "text",
-                        "content": encoded_content,
-                        "raw": encoded_content
-                    }
+            page_data["decoded_content"] = _LazyDecoded(page_data["page_content"])
         
         return page_data
     
+    def fetch_pages_info(self, page_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取多个页面的详细信息
+        
+        ShowDoc 没有批量获取页面的接口，这里按 PAGE_FETCH_BATCH_SIZE 分批，
+        在同一个 session 的 keep-alive 连接池上并发请求，减少串行往返等待。
+        
+        Args:
+            page_ids: 页面 ID 列表
+        
+        Returns:
+            page_id -> 页面数据 的字典，获取失败的页面不包含在结果中
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        # 去重并保持顺序
+        unique_ids = list(dict.fromkeys(pid for pid in page_ids if pid))
+        if not unique_ids:
+            return results
+        
+        def fetch_one(page_id: str):
+            try:
+                return page_id, self.fetch_page_info(page_id), None
+            except Exception as e:
+                return page_id, None, e
+        
+        workers = min(PAGE_FETCH_BATCH_SIZE, len(unique_ids))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for start in range(0, len(unique_ids), PAGE_FETCH_BATCH_SIZE):
+                batch = unique_ids[start:start + PAGE_FETCH_BATCH_SIZE]
+                for page_id, page_data, error in executor.map(fetch_one, batch):
+                    if error is not None:
+                        # 获取页面详情失败时记录错误，但不中断流程
+                        logger.warning("获取页面 %s 详情失败: %s", page_id, error)
+                        continue
+                    results[page_id] = page_data
+        
+        return results
+    
+    @staticmethod
+    def get_decoded_content(page_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        读取页面数据中的 decoded_content（按需解码）
+        
+        Args:
+            page_data: fetch_page_info 返回的页面数据
+        
+        Returns:
+            解码后的内容字典，页面没有 page_content 时返回 None
+        """
+        decoded_content = page_data.get("decoded_content")
+        if isinstance(decoded_content, _LazyDecoded):
+            return decoded_content.value()
+        return decoded_content
+    
     def _parse_api_definition(self, page_data: Dict[str, Any]) -> Optional[ApiDefinition]:
         """
         从页面数据中解析 API 定义
@@ -633,34 +847,37 @@ class ShowDocClient:
         Returns:
             ApiDefinition 对象，如果不是 API 页面则返回 None
         """
-        decoded_content = page_data.get("decoded_content")
+        decoded_content = self.get_decoded_content(page_data)
         if not decoded_content:
             return None
         
-        info = decoded_content.get("info", {})
-        if info.get("type") != "api":
+        content_get = decoded_content.get
+        info = content_get("info") or {}
+        info_get = info.get
+        if info_get("type") != "api":
             return None
         
-        request_data = decoded_content.get("request", {})
-        response_data = decoded_content.get("response", {})
+        request_data = content_get("request", {})
+        request_get = request_data.get
         
         return ApiDefinition(
-            method=info.get("method", "GET").upper(),
-            url=info.get("url", ""),
-            title=info.get("title", ""),
-            description=info.get("description", ""),
+            method=info_get("method", "GET").upper(),
+            url=info_get("url", ""),
+            title=info_get("title", ""),
+            description=info_get("description", ""),
             request=request_data,
-            response=response_data,
-            headers=request_data.get("headers"),
-            query=request_data.get("query"),
-            body=request_data.get("params")
+            response=content_get("response", {}),
+            headers=request_get("headers"),
+            query=request_get("query"),
+            body=request_get("params")
         )
     
     def _build_category_from_dict(
         self,
         cat_dict: Dict[str, Any],
         item_id: str,
-        fetch_details: bool = True
+        fetch_details: bool = True,
+        page_data_map: Optional[Dict[str, Dict[str, Any]]] = None
     ) -> Category:
         """
         从字典数据构建 Category 对象
@@ -669,62 +886,88 @@ class ShowDocClient:
             cat_dict: 分类字典数据
             item_id: 项目 ID
             fetch_details: 是否获取页面详情
+            page_data_map: 已获取的页面数据（page_id -> 页面数据），
+                           为 None 时会先并发获取整棵子树的页面详情
         
         Returns:
             Category 对象
         """
-        cat_id = str(cat_dict.get("cat_id", ""))
+        cat_get = cat_dict.get
+        cat_id = _as_str(cat_get("cat_id", ""))
         
-        # 构建页面列表
-        pages = []
-        page_list = cat_dict.get("pages", [])
-        for page_dict in page_list:
-            page_id = str(page_dict.get("page_id", ""))
+        # 一次性并发获取整棵子树的页面详情
+        if fetch_details and page_data_map is None:
+            page_data_map = self.fetch_pages_info(self._collect_page_ids(cat_dict))
+        
+        get_decoded_content = self.get_decoded_content
+        parse_api_definition = self._parse_api_definition
+        
+        def build_page(page_dict: Dict[str, Any]) -> Page:
+            page_get = page_dict.get
+            page_id = _as_str(page_get("page_id", ""))
             
             # 获取页面详情（如果需要）
             api_info = None
             raw_content = None
             if fetch_details and page_id:
-                try:
-                    page_data = self.fetch_page_info(page_id)
-                    raw_content = page_data.get("decoded_content")
-                    api_info = self._parse_api_definition(page_data)
-                except Exception as e:
-                    # 获取页面详情失败时记录错误，但不中断流程
-                    print(f"警告: 获取页面 {page_id} 详情失败: {str(e)}")
+                page_data = page_data_map.get(page_id)
+                if page_data is not None:
+                    raw_content = get_decoded_content(page_data)
+                    api_info = parse_api_definition(page_data)
             
-            page = Page(
+            return Page(
                 page_id=page_id,
-                page_title=page_dict.get("page_title", ""),
+                page_title=page_get("page_title", ""),
                 cat_id=cat_id,
-                author_uid=str(page_dict.get("author_uid", "")),
-                author_username=page_dict.get("author_username", ""),
+                author_uid=_as_str(page_get("author_uid", "")),
+                author_username=page_get("author_username", ""),
                 api_info=api_info,
-                ext_info=page_dict.get("ext_info"),
+                ext_info=page_get("ext_info"),
                 raw_content=raw_content
             )
-            pages.append(page)
+        
+        # 构建页面列表
+        pages = [build_page(page_dict) for page_dict in cat_get("pages", [])]
         
         # 递归构建子分类
-        children = []
-        sub_catalogs = cat_dict.get("catalogs", [])
-        for sub_cat_dict in sub_catalogs:
-            child_cat = self._build_category_from_dict(
-                sub_cat_dict, item_id, fetch_details
-            )
-            children.append(child_cat)
+        children = [
+            self._build_category_from_dict(sub_cat_dict, item_id, fetch_details, page_data_map)
+            for sub_cat_dict in cat_get("catalogs", [])
+        ]
         
         return Category(
             cat_id=cat_id,
-            cat_name=cat_dict.get("cat_name", ""),
+            cat_name=cat_get("cat_name", ""),
             item_id=item_id,
-            parent_cat_id=str(cat_dict.get("parent_cat_id", "")),
-            level=int(cat_dict.get("level", 0)),
-            s_number=str(cat_dict.get("s_number", "")),
+            parent_cat_id=_as_str(cat_get("parent_cat_id", "")),
+            level=int(cat_get("level", 0)),
+            s_number=_as_str(cat_get("s_number", "")),
             pages=pages,
             children=children
         )
     
+    @staticmethod
+    def _collect_page_ids(cat_dict: Dict[str, Any]) -> List[str]:
+        """
+        收集分类节点及其所有子分类下的页面 ID（先序遍历顺序）
+        
+        Args:
+            cat_dict: 分类字典数据
+        
+        Returns:
+            页面 ID 列表
+        """
+        page_ids = []
+        stack = [cat_dict]
+        while stack:
+            cat = stack.pop()
+            for page_dict in cat.get("pages", []):
+                page_id = str(page_dict.get("page_id", ""))
+                if page_id:
+                    page_ids.append(page_id)
+            stack.extend(reversed(cat.get("catalogs", [])))
+        return page_ids
+    
     def _find_category_by_page_id(
         self,
         categories: List[Dict[str, Any]],
@@ -765,6 +1008,9 @@ class ShowDocClient:
         """
         递归筛选分类节点
         
+        首次调用时对目录树做一次遍历，建立 名称 -> 节点列表 索引，
+        之后针对同一棵树的筛选直接查索引。
+        
         Args:
             categories: 分类列表
             node_name: 节点名称，None/"全部"/"all" 表示返回所有
@@ -775,25 +1021,38 @@ class ShowDocClient:
         if not node_name or node_name.strip().lower() in ("全部", "all"):
             return categories
         
-        node_name = node_name.strip()
+        if self._name_index is None or self._name_index_source is not categories:
+            self._name_index = self._build_name_index(categories)
+            self._name_index_source = categories
         
-        def search_and_collect(cat_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-            result = []
-            for cat in cat_list:
-                cat_name = cat.get("cat_name", "")
-                if cat_name == node_name:
-                    # 找到匹配的节点，返回该节点及其所有子节点
-                    result.append(cat)
-                else:
-                    # 递归搜索子分类
-                    sub_catalogs = cat.get("catalogs", [])
-                    if sub_catalogs:
-                        matched = search_and_collect(sub_catalogs)
-                        if matched:
-                            result.extend(matched)
-            return result
-        
-        return search_and_collect(categories)
+        return list(self._name_index.get(node_name.strip(), []))
+    
+    @staticmethod
+    def _build_name_index(categories: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        构建 名称 -> 节点列表 索引（先序遍历顺序）
+        
+        与逐层匹配的语义保持一致：某节点已匹配时，其子孙中的同名节点不再重复收录。
+        
+        Args:
+            categories: 分类列表
+        
+        Returns:
+            名称到分类节点列表的字典
+        """
+        index: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        # 栈元素：(分类节点, 祖先节点名称集合)
+        stack = [(cat, frozenset()) for cat in reversed(categories)]
+        while stack:
+            cat, ancestor_names = stack.pop()
+            cat_name = cat.get("cat_name", "")
+            if cat_name not in ancestor_names:
+                index[cat_name].append(cat)
+            sub_catalogs = cat.get("catalogs", [])
+            if sub_catalogs:
+                child_names = ancestor_names | {cat_name}
+                stack.extend((sub_cat, child_names) for sub_cat in reversed(sub_catalogs))
+        return dict(index)
     
     def _simplify_category_tree(self, catalog: Dict[str, Any], item_id: str) -> Dict[str, Any]:
         """
@@ -830,6 +1089,17 @@ class ShowDocClient:
             "children": children,
         }
 
+    @staticmethod
+    def _count_tree_pages(categories: List[Dict[str, Any]]) -> int:
+        """统计精简节点树中所有分类（含子分类）的页面总数（显式栈迭代）"""
+        total = 0
+        stack = list(categories)
+        while stack:
+            node = stack.pop()
+            total += len(node["pages"])
+            stack.extend(node["children"])
+        return total
+
     def get_all_apis(self, node_name: Optional[str] = None, page_id: Optional[str] = None) -> ApiTree:
         """
         获取所有接口数据（主入口方法）
@@ -902,11 +1172,16 @@ class ShowDocClient:
         else:
             filtered_catalogs = all_catalogs
         
-        # 步骤5: 构建完整的树结构（包括页面详情）
+        # 步骤5: 并发获取所有页面详情，再构建完整的树结构
+        page_ids = []
+        for cat_dict in filtered_catalogs:
+            page_ids.extend(self._collect_page_ids(cat_dict))
+        page_data_map = self.fetch_pages_info(page_ids)
+        
         categories = []
         for cat_dict in filtered_catalogs:
             category = self._build_category_from_dict(
-                cat_dict, item_info.item_id, fetch_details=True
+                cat_dict, item_info.item_id, fetch_details=True, page_data_map=page_data_map
             )
             categories.append(category)
         
@@ -925,6 +1200,9 @@ class ShowDocClient:
         Args:
             node_name: 节点名称（分类名称）
             page_id: 页面 ID，如果提供则根据 page_id 查找对应的分类节点
+        
+        Returns:
+            包含 item_info、categories 以及 total_pages（所有分类下的页面总数）的字典
         """
         try:
             self.fetch_homepage()
@@ -976,5 +1254,7 @@ class ShowDocClient:
         return {
             "item_info": item_info,
             "categories": simplified_categories,
+            # 构建时统计一次，调用方无需再次遍历整棵树
+            "total_pages": self._count_tree_pages(simplified_categories),
         }
 
@@ -6,9 +6,11 @@ from __future__ import annotations
 
 import json
 import os
-from datetime import datetime, timedelta
+import time
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 from urllib.parse import urlparse
 
 
@@ -18,6 +20,9 @@ class CookieManager:
     # Cookie 默认过期时间（24小时）
     DEFAULT_EXPIRY_HOURS = 24
     
+    # 服务器地址允许的协议前缀
+    _URL_SCHEMES = ('http://', 'https://')
+    
     def __init__(self, cookie_file: Optional[Path] = None):
         """
         初始化 Cookie 管理器
@@ -30,36 +35,103 @@ class CookieManager:
             cookie_file = Path.cwd() / "output" / ".showdoc_cookies.json"
         self.cookie_file = Path(cookie_file)
         self.cookies_data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # 规范化服务器地址缓存（原始地址 -> 规范化地址）
+        self._norm_cache: Dict[str, str] = {}
         self._load_cookies()
     
+    @contextmanager
+    def _file_lock(self, shared: bool = False) -> Iterator[None]:
+        """
+        在 Cookie 文件旁的 .lock 文件上加建议锁，避免多进程同时读写
+        
+        Args:
+            shared: 是否加共享锁（读取时使用，仅 POSIX 支持；Windows 下总是独占锁）
+        """
+        lock_path = self.cookie_file.with_name(self.cookie_file.name + ".lock")
+        try:
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            lock_file = open(lock_path, "a+b")
+        except OSError:
+            # 无法创建锁文件时不加锁，保持原有行为
+            yield
+            return
+        
+        try:
+            if os.name == "nt":
+                import msvcrt
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        except OSError:
+            # 加锁失败（如超时）时不加锁继续
+            lock_file.close()
+            yield
+            return
+        
+        try:
+            yield
+        finally:
+            try:
+                if os.name == "nt":
+                    import msvcrt
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+                else:
+                    import fcntl
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            except OSError:
+                pass
+            lock_file.close()
+    
     def _load_cookies(self) -> None:
         """从文件加载 Cookie 数据"""
         if self.cookie_file.exists():
             try:
-                with open(self.cookie_file, "r", encoding="utf-8") as f:
-                    self.cookies_data = json.load(f)
+                with self._file_lock(shared=True):
+                    with open(self.cookie_file, "r", encoding="utf-8") as f:
+                        self.cookies_data = json.load(f)
             except Exception:
                 self.cookies_data = {}
         else:
             self.cookies_data = {}
     
     def _save_cookies(self) -> None:
-        """保存 Cookie 数据到文件"""
+        """
+        保存 Cookie 数据到文件
+        
+        先写入临时文件并刷盘，再用 os.replace 原子替换，
+        避免写入中途崩溃导致 Cookie 文件被截断。
+        """
+        tmp_file = self.cookie_file.with_suffix(".tmp")
         try:
             self.cookie_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.cookie_file, "w", encoding="utf-8") as f:
-                json.dump(self.cookies_data, f, ensure_ascii=False, indent=2)
+            with self._file_lock():
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(self.cookies_data, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.cookie_file)
         except Exception:
-            pass
+            try:
+                tmp_file.unlink()
+            except OSError:
+                pass
     
     def _normalize_server_base(self, server_base: str) -> str:
-        """规范化服务器地址"""
+        """规范化服务器地址（结果按原始地址缓存）"""
+        cached = self._norm_cache.get(server_base)
+        if cached is not None:
+            return cached
+        
         # 移除末尾的斜杠
-        server_base = server_base.rstrip('/')
+        normalized = server_base.rstrip('/')
         # 确保以 http:// 或 https:// 开头
-        if not server_base.startswith(('http://', 'https://')):
-            server_base = 'https://' + server_base
-        return server_base
+        if not normalized.startswith(self._URL_SCHEMES):
+            normalized = 'https://' + normalized
+        self._norm_cache[server_base] = normalized
+        return normalized
     
     def get_cookie(self, server_base: str, item_id: str) -> Optional[str]:
         """
@@ -82,16 +154,25 @@ class CookieManager:
         
         cookie_info = self.cookies_data[server_base][item_id]
         cookie = cookie_info.get("cookie")
-        timestamp_str = cookie_info.get("timestamp")
+        timestamp = cookie_info.get("timestamp")
         
-        if not cookie or not timestamp_str:
+        if not cookie or not timestamp:
             return None
         
+        # 兼容旧格式：ISO 时间字符串，解析一次后改写为 Unix 时间戳
+        if isinstance(timestamp, str):
+            try:
+                timestamp = int(datetime.fromisoformat(timestamp).timestamp())
+            except Exception:
+                # 解析时间戳失败，认为已过期
+                return None
+            cookie_info["timestamp"] = timestamp
+            self._save_cookies()
+        
         # 检查是否过期
         try:
-            timestamp = datetime.fromisoformat(timestamp_str)
             expiry_hours = cookie_info.get("expiry_hours", self.DEFAULT_EXPIRY_HOURS)
-            if datetime.now() - timestamp > timedelta(hours=expiry_hours):
+            if int(time.time()) - timestamp > expiry_hours * 3600:
                 # Cookie 已过期，删除它
                 del self.cookies_data[server_base][item_id]
                 if not self.cookies_data[server_base]:
@@ -99,7 +180,7 @@ class CookieManager:
                 self._save_cookies()
                 return None
         except Exception:
-            # 解析时间戳失败，认为已过期
+            # 时间戳格式错误，认为已过期
             return None
         
         return cookie
@@ -121,7 +202,7 @@ class CookieManager:
         
         self.cookies_data[server_base][item_id] = {
             "cookie": cookie,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": int(time.time()),
             "expiry_hours": expiry_hours,
         }
         
@@ -67,6 +67,18 @@ class ApiTree:
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
+        def api_info_to_dict(api_info: Optional[ApiDefinition]) -> Optional[Dict[str, Any]]:
+            if api_info is None:
+                return None
+            return {
+                "method": api_info.method,
+                "url": api_info.url,
+                "title": api_info.title,
+                "description": api_info.description,
+                "request": api_info.request,
+                "response": api_info.response,
+            }
+        
         def category_to_dict(cat: Category) -> Dict[str, Any]:
             return {
                 "cat_id": cat.cat_id,
@@ -77,14 +89,7 @@ class ApiTree:
                     {
                         "page_id": page.page_id,
                         "page_title": page.page_title,
-                        "api_info": {
-                            "method": page.api_info.method,
-                            "url": page.api_info.url,
-                            "title": page.api_info.title,
-                            "description": page.api_info.description,
-                            "request": page.api_info.request,
-                            "response": page.api_info.response,
-                        } if page.api_info else None
+                        "api_info": api_info_to_dict(page.api_info),
                     }
                     for page in cat.pages
                 ],
@@ -98,4 +103,3 @@ class ApiTree:
             },
             "categories": [category_to_dict(cat) for cat in self.categories]
         }
-
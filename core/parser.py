@@ -4,16 +4,147 @@ URL 解析和数据解析工具函数
 import re
 import json
 import html
-from typing import Optional, Dict, Any, List
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple, Union
 from urllib.parse import urlparse, parse_qs
 
 from .exceptions import ShowDocParseError
 
+# JSON 解析优先使用更快的 orjson / ujson（可选依赖），都未安装时使用标准库
+try:
+    import orjson as _json
+except ImportError:
+    try:
+        import ujson as _json
+    except ImportError:
+        _json = json
+
 # ShowDoc API 错误码常量
 ERROR_CODE_SUCCESS = 0
 ERROR_CODE_PASSWORD_REQUIRED = 10303  # 不是项目创建者（需要密码）
 ERROR_CODE_CAPTCHA_INCORRECT = 10206  # 验证码不正确
 
+# parse_showdoc_url 使用的预编译正则
+_RE_FRAG_ITEM_PATH = re.compile(r'/(?:item|password)/(\d+)')  # #/item/password/88
+_RE_FRAG_ITEM_PAGE = re.compile(r'^/?(\d+)/(\d+)')  # #/94/4828
+_RE_FRAG_ID = re.compile(r'^/?(\d+)')  # #/90/
+_RE_PATH_ID = re.compile(r'/(\d+)/?$')  # /web/90/
+_RE_PAGE_ID = re.compile(r'page_id=(\d+)')
+
+# 删除 Latin-1 范围内所有非数字字符的转换表：url.translate(_DIGITS_KEEP) 为空
+# 说明 URL 中不可能有数字，可以跳过所有按数字匹配的正则
+_DIGITS_KEEP = str.maketrans("", "", "".join(chr(i) for i in range(256) if not chr(i).isdigit()))
+
+
+def _split_url(url: str) -> Tuple[str, str, str, str, str]:
+    """
+    将 URL 拆分为 (scheme, netloc, path, query, fragment)
+    
+    ShowDoc 链接几乎都是 "http(s)://host/path?query#fragment" 这种简单形式，
+    直接用 str.partition 拆分；其余情况（其他协议、含空白/控制字符、;params、
+    IPv6 地址等）交给 urllib.parse.urlparse，结果与 urlparse 一致。
+    
+    Args:
+        url: 待拆分的 URL
+    
+    Returns:
+        (scheme, netloc, path, query, fragment) 元组
+    """
+    scheme, sep, rest = url.partition("://")
+    if (
+        sep
+        and scheme in ("http", "https")
+        and ";" not in rest
+        and "[" not in rest
+        and "]" not in rest
+        and url.isascii()
+        and url.isprintable()
+        and not url[-1].isspace()
+    ):
+        rest, _, fragment = rest.partition("#")
+        rest, _, query = rest.partition("?")
+        netloc, slash, path = rest.partition("/")
+        return scheme, netloc, slash + path, query, fragment
+    
+    parsed = urlparse(url)
+    return parsed.scheme, parsed.netloc, parsed.path, parsed.query, parsed.fragment
+
+
+def _extract_item_id(
+    path: str,
+    query: str,
+    fragment: str,
+    has_digits: bool
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    从拆分后的 URL 各部分中提取 item_id（以及同时解析出的 page_id）
+    
+    可能的位置：
+    1. 哈希路径：/web/#/90/ -> 90
+    2. 哈希路径（登录页）：/web/#/item/password/88 -> 88
+    3. 查询参数：?item_id=90
+    4. 路径参数：/web/90/
+    
+    Args:
+        path: URL 路径
+        query: 查询字符串
+        fragment: 哈希部分
+        has_digits: URL 中是否含有数字（不含数字时跳过所有按数字匹配的步骤）
+    
+    Returns:
+        (item_id, page_id) 元组，未找到时对应项为 None
+    """
+    item_id = None
+    extracted_page_id: Optional[str] = None
+    
+    # 尝试从哈希路径提取
+    if has_digits and fragment:
+        # 支持的哈希格式：
+        # - #/90/ 或 #/90 -> 90
+        # - #/item/password/88 -> 88
+        # - #/item/88 -> 88
+        # - #/94/4828 -> item_id=94, page_id=4828
+        
+        # 先尝试匹配路径中的数字（如 /item/password/88 或 /item/88）
+        path_match = _RE_FRAG_ITEM_PATH.search(fragment)
+        if path_match:
+            item_id = path_match.group(1)
+        else:
+            # 尝试匹配 item_id/page_id 格式（如 /94/4828）
+            double_match = _RE_FRAG_ITEM_PAGE.search(fragment)
+            if double_match:
+                item_id = double_match.group(1)
+                extracted_page_id = double_match.group(2)
+            else:
+                # 再尝试匹配开头的数字（如 /90/ 或 90）
+                match = _RE_FRAG_ID.search(fragment)
+                if match:
+                    item_id = match.group(1)
+    
+    # 尝试从查询参数提取
+    # 查询串中不含 item_id（也没有百分号编码）时无需调用 parse_qs
+    if not item_id and ("item_id" in query or "%" in query):
+        query_params = parse_qs(query)
+        if 'item_id' in query_params:
+            item_id = query_params['item_id'][0]
+    
+    # 尝试从路径段提取（兼容 showdoc.com.cn 的分享链接）
+    if not item_id and has_digits:
+        path_segments = [seg for seg in path.split("/") if seg]
+        if path_segments and path_segments[0].isdigit():
+            item_id = path_segments[0]
+            # 第二段如果是纯数字，视为 page_id
+            if len(path_segments) > 1 and path_segments[1].isdigit():
+                extracted_page_id = path_segments[1]
+
+    # 尝试从路径中提取
+    if not item_id and has_digits:
+        path_match = _RE_PATH_ID.search(path)
+        if path_match:
+            item_id = path_match.group(1)
+    
+    return item_id, extracted_page_id
+
 
 def parse_showdoc_url(url: str) -> Dict[str, str]:
     """
@@ -35,71 +166,19 @@ def parse_showdoc_url(url: str) -> Dict[str, str]:
         ShowDocParseError: URL 格式不正确
     """
     try:
-        parsed = urlparse(url)
-        server_base = f"{parsed.scheme}://{parsed.netloc}"
-        
-        # 从 URL 中提取 item_id
-        # 可能的位置：
-        # 1. 哈希路径：/web/#/90/ -> 90
-        # 2. 哈希路径（登录页）：/web/#/item/password/88 -> 88
-        # 3. 查询参数：?item_id=90
-        # 4. 路径参数：/web/90/
+        scheme, netloc, path, query, fragment = _split_url(url)
+        server_base = f"{scheme}://{netloc}"
         
-        item_id = None
-        extracted_page_id: Optional[str] = None
-        
-        # 尝试从哈希路径提取
-        if parsed.fragment:
-            fragment = parsed.fragment
-            # 支持的哈希格式：
-            # - #/90/ 或 #/90 -> 90
-            # - #/item/password/88 -> 88
-            # - #/item/88 -> 88
-            # - #/94/4828 -> item_id=94, page_id=4828
-            
-            # 先尝试匹配路径中的数字（如 /item/password/88 或 /item/88）
-            path_match = re.search(r'/(?:item|password)/(\d+)', fragment)
-            if path_match:
-                item_id = path_match.group(1)
-            else:
-                # 尝试匹配 item_id/page_id 格式（如 /94/4828）
-                double_match = re.search(r'^/?(\d+)/(\d+)', fragment)
-                if double_match:
-                    item_id = double_match.group(1)
-                    extracted_page_id = double_match.group(2)
-                else:
-                    # 再尝试匹配开头的数字（如 /90/ 或 90）
-                    match = re.search(r'^/?(\d+)', fragment)
-                    if match:
-                        item_id = match.group(1)
-        
-        # 尝试从查询参数提取
-        if not item_id:
-            query_params = parse_qs(parsed.query)
-            if 'item_id' in query_params:
-                item_id = query_params['item_id'][0]
-        
-        # 尝试从路径段提取（兼容 showdoc.com.cn 的分享链接）
-        if not item_id:
-            path_segments = [seg for seg in parsed.path.split("/") if seg]
-            if path_segments and path_segments[0].isdigit():
-                item_id = path_segments[0]
-                # 第二段如果是纯数字，视为 page_id
-                if len(path_segments) > 1 and path_segments[1].isdigit():
-                    extracted_page_id = path_segments[1]
-
-        # 尝试从路径中提取
-        if not item_id:
-            path_match = re.search(r'/(\d+)/?$', parsed.path)
-            if path_match:
-                item_id = path_match.group(1)
+        # 除查询参数外，其余提取方式都要求数字；URL 中没有数字时全部跳过
+        has_digits = bool(url.translate(_DIGITS_KEEP))
         
+        item_id, extracted_page_id = _extract_item_id(path, query, fragment, has_digits)
         if not item_id:
             raise ShowDocParseError(f"无法从 URL 中提取 item_id: {url}")
         
         # 提取 page_id（可能在查询参数或 redirect 参数中）
         page_id = extracted_page_id
-        page_id_match = re.search(r'page_id=(\d+)', url)
+        page_id_match = _RE_PAGE_ID.search(url) if has_digits else None
         if page_id_match:
             page_id = page_id_match.group(1)
         
@@ -116,22 +195,33 @@ def extract_item_id_from_url(url: str) -> str:
     """
     从 URL 中提取 item_id（便捷函数）
     
+    只提取 item_id，不构建 parse_showdoc_url 的结果字典。
+    
     Args:
         url: ShowDoc 文档 URL
     
     Returns:
         item_id 字符串
+    
+    Raises:
+        ShowDocParseError: URL 格式不正确
     """
-    result = parse_showdoc_url(url)
-    return result["item_id"]
+    try:
+        _, _, path, query, fragment = _split_url(url)
+        item_id, _ = _extract_item_id(path, query, fragment, bool(url.translate(_DIGITS_KEEP)))
+        if not item_id:
+            raise ShowDocParseError(f"无法从 URL 中提取 item_id: {url}")
+        return item_id
+    except Exception as e:
+        raise ShowDocParseError(f"解析 URL 失败: {str(e)}") from e
 
 
-def decode_page_content(encoded_content: str) -> Dict[str, Any]:
+def decode_page_content(encoded_content: Union[str, bytes]) -> Dict[str, Any]:
     """
     HTML 实体解码并解析 JSON
     
     Args:
-        encoded_content: 经过 HTML 实体编码的 JSON 字符串
+        encoded_content: 经过 HTML 实体编码的 JSON 字符串（也接受 UTF-8 字节串）
     
     Returns:
         解析后的 JSON 对象（字典）
@@ -140,14 +230,20 @@ def decode_page_content(encoded_content: str) -> Dict[str, Any]:
         ShowDocParseError: 解码或解析失败
     """
     try:
-        # 1. HTML 实体解码
-        decoded_content = html.unescape(encoded_content)
+        # 字节串中没有 HTML 实体时直接解析，省去 bytes -> str 转换
+        if isinstance(encoded_content, bytes):
+            if b"&" not in encoded_content:
+                return _json.loads(encoded_content)
+            encoded_content = encoded_content.decode("utf-8")
+        
+        # 1. HTML 实体解码（不含 & 时不可能有实体，跳过整串扫描重建）
+        decoded_content = html.unescape(encoded_content) if "&" in encoded_content else encoded_content
         
         # 2. 解析为 JSON 对象
-        page_content = json.loads(decoded_content)
+        page_content = _json.loads(decoded_content)
         
         return page_content
-    except json.JSONDecodeError as e:
+    except (json.JSONDecodeError, ValueError) as e:
         raise ShowDocParseError(f"JSON 解析失败: {str(e)}") from e
     except Exception as e:
         raise ShowDocParseError(f"解码 page_content 失败: {str(e)}") from e
@@ -159,7 +255,9 @@ def find_category_by_name(
     recursive: bool = True
 ) -> Optional[Dict[str, Any]]:
     """
-    在目录树中递归查找指定名称的分类
+    在目录树中查找指定名称的分类（先序遍历，返回第一个匹配项）
+    
+    递归查找时遍历到第一个匹配项即返回，不缓存索引（目录树可能被调用方修改）。
     
     Args:
         categories: 分类列表（从 API 返回的目录树数据）
@@ -174,24 +272,23 @@ def find_category_by_name(
     
     name = name.strip()
     
-    def search_recursive(cat_list: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
-        for cat in cat_list:
-            # 检查当前分类名称
-            cat_name = cat.get("cat_name", "")
-            if cat_name == name:
+    if not recursive:
+        for cat in categories:
+            if cat.get("cat_name", "") == name:
                 return cat
-            
-            # 递归查找子分类
-            if recursive:
-                children = cat.get("catalogs", [])
-                if children:
-                    result = search_recursive(children)
-                    if result:
-                        return result
-        
         return None
     
-    return search_recursive(categories)
+    # 用显式栈做先序遍历，避免深层目录触发递归深度限制
+    stack = deque(reversed(categories))
+    while stack:
+        cat = stack.pop()
+        get = cat.get
+        if get("cat_name", "") == name:
+            return cat
+        children = get("catalogs")
+        if children:
+            stack.extend(reversed(children))
+    return None
 
 
 def filter_categories_by_name(
@@ -236,13 +333,19 @@ def build_category_tree(
     """
     # API 返回的数据已经是树状结构（通过 parent_cat_id 和 catalogs 字段）
     # 这里主要是提取顶层分类
-    if isinstance(category_data, dict):
-        if "menu" in category_data:
-            menu = category_data["menu"]
-            if "catalogs" in menu:
-                return menu["catalogs"]
-        elif "catalogs" in category_data:
-            return category_data["catalogs"]
-    
-    return []
+    # 正常情况下键都存在，直接取值（EAFP），比逐个 in 判断少几次字典查找
+    try:
+        menu = category_data["menu"]
+    except (KeyError, TypeError):
+        try:
+            catalogs = category_data["catalogs"]
+        except (KeyError, TypeError):
+            catalogs = []
+    else:
+        try:
+            catalogs = menu["catalogs"]
+        except (KeyError, TypeError):
+            catalogs = []
+    
+    return catalogs
 
@@ -11,11 +11,12 @@ import json
 import os
 import re
 import shutil
+import threading
 import uuid
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Iterator, NamedTuple
 
 import cv2  # type: ignore
 import numpy as np  # type: ignore
@@ -26,6 +27,18 @@ from .exceptions import ShowDocCaptchaError
 _ddddocr = None
 _enable_debug_log = False
 
+# 预处理变体使用的卷积/形态学核（只读，模块级创建一次）
+_KERNEL_SMALL = np.ones((2, 2), np.uint8)
+_KERNEL_MED = np.ones((3, 3), np.uint8)
+_SHARPEN_KERNEL = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]])
+
+# 本进程是否已清理过调试目录
+_debug_dir_cleaned = False
+
+# 共享的识别器实例（按参数缓存），避免每次登录都重新加载 ddddocr 模型
+_solvers: dict = {}
+_solvers_lock = threading.Lock()
+
 
 def _get_ddddocr():
     """获取 ddddocr 模块"""
@@ -41,8 +54,7 @@ def _get_ddddocr():
     return _ddddocr
 
 
-@dataclass
-class CaptchaSolveResult:
+class CaptchaSolveResult(NamedTuple):
     text: str
     confidence: float
 
@@ -51,8 +63,20 @@ def get_captcha_solver(
         whitelist: str = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ",
         min_confidence: float = 0.5,
 ) -> 'SimpleCaptchaSolver':
-    """获取 SimpleCaptchaSolver 实例"""
-    return SimpleCaptchaSolver(whitelist, min_confidence)
+    """
+    获取共享的 SimpleCaptchaSolver 实例
+    
+    相同参数只创建一次实例，所有登录重试和 ShowDocClient 实例共用同一个已加载的模型。
+    """
+    key = (whitelist, min_confidence)
+    solver = _solvers.get(key)
+    if solver is None:
+        with _solvers_lock:
+            solver = _solvers.get(key)
+            if solver is None:
+                solver = SimpleCaptchaSolver(whitelist, min_confidence)
+                _solvers[key] = solver
+    return solver
 
 
 class SimpleCaptchaSolver:
@@ -84,12 +108,25 @@ class SimpleCaptchaSolver:
             show_ad: 是否显示 ddddocr 的广告信息（默认 False）
         """
         self.whitelist = whitelist
+        # 字符集合，用于 O(1) 判断字符是否在白名单中（字符串本身保留给 set_ranges）
+        self._whitelist_set = frozenset(whitelist)
+        # ASCII 白名单额外预先计算 bytes.translate 的删除表，一次 C 级调用完成过滤
+        try:
+            allowed = set(whitelist.encode("ascii"))
+            self._delete_bytes: Optional[bytes] = bytes(b for b in range(256) if b not in allowed)
+        except UnicodeEncodeError:
+            self._delete_bytes = None
         self.min_confidence = min_confidence
         self.save_variants = save_variants
         
+        # 调试图片在后台线程写盘（OpenCV 编码时释放 GIL），不阻塞识别循环
+        self._io_pool = ThreadPoolExecutor(max_workers=2) if save_variants else None
+        
         # 初始化 ddddocr
         ddddocr_module = _get_ddddocr()
         self.ocr = ddddocr_module.DdddOcr(show_ad=show_ad)
+        # classification 是否接受 PIL 图片（首次调用失败后置为 False）
+        self._accepts_pil = True
         
         # 如果提供了 whitelist，尝试设置字符范围限制（如果方法存在）
         if whitelist and hasattr(self.ocr, 'set_ranges'):
@@ -98,12 +135,18 @@ class SimpleCaptchaSolver:
             except Exception:
                 # set_ranges 可能在某些版本中不可用，忽略错误
                 pass
-        
-        # 清理旧的调试目录（每次运行都清空）
-        self._clean_debug_directory()
 
     def _clean_debug_directory(self) -> None:
-        """清理调试目录，删除所有旧文件（每次运行都清空）"""
+        """
+        清理调试目录，删除所有旧文件（每个进程只清理一次）
+        
+        只在第一次保存调试信息前调用；不保存调试信息时不会触碰该目录。
+        """
+        global _debug_dir_cleaned
+        if _debug_dir_cleaned:
+            return
+        _debug_dir_cleaned = True
+        
         # 获取调试目录路径（支持环境变量自定义）
         debug_dir = Path(os.environ.get("SHOWDOC_CAPTCHA_DEBUG_DIR", "output/captcha_debug"))
         
@@ -129,41 +172,88 @@ class SimpleCaptchaSolver:
         if not image_bytes:
             raise ShowDocCaptchaError("验证码图片内容为空")
 
-        # 解码图片用于调试保存
+        # 解码图片（用于生成预处理变体和调试保存）
         np_img = np.frombuffer(image_bytes, dtype=np.uint8)
         img = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
         if img is None:
             raise ShowDocCaptchaError("无法解码验证码图片")
 
+        # 只在入口判断一次是否保存调试信息，识别循环内不再逐个变体判断
+        if self.save_variants:
+            return self._solve_debug(image_bytes, img)
+        return self._solve_fast(image_bytes, img)
+
+    def _solve_fast(self, image_bytes: bytes, img: np.ndarray) -> CaptchaSolveResult:
+        """识别验证码（不保存调试信息）"""
         errors = []
-        debug_session: Optional[Path] = None
-        attempt_logs: List[dict] = []
         
-        if self.save_variants:
-            debug_session = self._start_debug_session(img)
+        # 使用 ddddocr 直接识别原始图片（效果最好）
+        try:
+            result = self.ocr.classification(image_bytes)
+            if result and isinstance(result, str):
+                cleaned = self._clean_text(result)
+                if cleaned:
+                    normalized = self._normalize_result(cleaned)
+                    if _enable_debug_log:
+                        print(f"[CaptchaSolver] recognized captcha={normalized} (ddddocr)")
+                    return CaptchaSolveResult(text=normalized, confidence=1.0)
+                errors.append(f"原始识别结果不在允许字符集中: {repr(result)}")
+            else:
+                errors.append(f"识别结果为空或格式错误: {repr(result)}")
+        except Exception as e:
+            errors.append(f"ddddocr识别失败: {e}")
+        
+        # 如果直接识别失败，尝试预处理后的变体（按需生成）
+        for processed, desc in self._generate_variants(img):
+            try:
+                result = self._classify_array(processed)
+                if result and isinstance(result, str):
+                    cleaned = self._clean_text(result)
+                    if cleaned:
+                        normalized = self._normalize_result(cleaned)
+                        if _enable_debug_log:
+                            print(
+                                f"[CaptchaSolver] recognized captcha={normalized} "
+                                f"(variant={desc})"
+                            )
+                        return CaptchaSolveResult(text=normalized, confidence=1.0)
+                    errors.append(f"{desc}: 识别结果不在允许字符集中, raw={repr(result)}")
+                else:
+                    errors.append(f"{desc}: 识别结果为空")
+            except Exception as e:
+                errors.append(f"{desc}: {e}")
+        
+        raise self._solve_failed_error(errors)
+
+    def _solve_debug(self, image_bytes: bytes, img: np.ndarray) -> CaptchaSolveResult:
+        """识别验证码，同时保存原图、各预处理变体和识别日志到调试目录"""
+        errors = []
+        attempt_logs: List[dict] = []
+        # 本次会话提交的异步写图任务（求解器可能被多个线程共用，不能放在实例上）
+        pending_writes: List[Future] = []
+        debug_session = self._start_debug_session(img, pending_writes)
         
         # 使用 ddddocr 直接识别原始图片（效果最好）
         try:
             result = self.ocr.classification(image_bytes)
             if result and isinstance(result, str):
-                cleaned = ''.join(c for c in result if c in self.whitelist)
+                cleaned = self._clean_text(result)
                 if cleaned:
                     normalized = self._normalize_result(cleaned)
-                    if debug_session is not None:
-                        log_entry = {
-                            "method": "ddddocr_direct",
-                            "raw_text": result,
-                            "cleaned": cleaned,
-                            "normalized": normalized,
-                            "status": "success",
-                        }
-                        attempt_logs.append(log_entry)
-                        self._finalize_debug_session(
-                            debug_session,
-                            attempt_logs,
-                            normalized,
-                            success=True,
-                        )
+                    attempt_logs.append({
+                        "method": "ddddocr_direct",
+                        "raw_text": result,
+                        "cleaned": cleaned,
+                        "normalized": normalized,
+                        "status": "success",
+                    })
+                    self._finalize_debug_session(
+                        debug_session,
+                        pending_writes,
+                        attempt_logs,
+                        normalized,
+                        success=True,
+                    )
                     
                     if _enable_debug_log:
                         print(f"[CaptchaSolver] recognized captcha={normalized} (ddddocr)")
@@ -175,27 +265,20 @@ class SimpleCaptchaSolver:
                 errors.append(f"识别结果为空或格式错误: {repr(result)}")
         except Exception as e:
             errors.append(f"ddddocr识别失败: {e}")
-            if debug_session is not None:
-                attempt_logs.append({
-                    "method": "ddddocr_direct",
-                    "error": str(e),
-                    "status": "error",
-                })
+            attempt_logs.append({
+                "method": "ddddocr_direct",
+                "error": str(e),
+                "status": "error",
+            })
         
-        # 如果直接识别失败，尝试预处理后的变体
-        variants = self._generate_variants(img)
-        for idx, (processed, desc) in enumerate(variants, start=1):
-            if debug_session is not None:
-                self._save_variant_image(debug_session, processed, f"{idx:02d}_{desc}")
+        # 如果直接识别失败，尝试预处理后的变体（按需生成）
+        for idx, (processed, desc) in enumerate(self._generate_variants(img), start=1):
+            self._save_variant_image(debug_session, processed, f"{idx:02d}_{desc}", pending_writes)
             
             try:
-                # 将处理后的图片编码为字节
-                _, encoded = cv2.imencode('.png', processed)
-                variant_bytes = encoded.tobytes()
-                
-                result = self.ocr.classification(variant_bytes)
+                result = self._classify_array(processed)
                 if result and isinstance(result, str):
-                    cleaned = ''.join(c for c in result if c in self.whitelist)
+                    cleaned = self._clean_text(result)
                     log_entry = {
                         "variant": desc,
                         "variant_index": idx,
@@ -209,123 +292,166 @@ class SimpleCaptchaSolver:
                                 f"[CaptchaSolver] recognized captcha={normalized} "
                                 f"(variant={desc})"
                             )
-                        if debug_session is not None:
-                            log_entry["status"] = "success"
-                            log_entry["normalized"] = normalized
-                            attempt_logs.append(log_entry)
-                            self._finalize_debug_session(
-                                debug_session,
-                                attempt_logs,
-                                normalized,
-                                success=True,
-                            )
+                        log_entry["status"] = "success"
+                        log_entry["normalized"] = normalized
+                        attempt_logs.append(log_entry)
+                        self._finalize_debug_session(
+                            debug_session,
+                            pending_writes,
+                            attempt_logs,
+                            normalized,
+                            success=True,
+                        )
                         return CaptchaSolveResult(text=normalized, confidence=1.0)
                     errors.append(f"{desc}: 识别结果不在允许字符集中, raw={repr(result)}")
-                    if debug_session is not None:
-                        log_entry["status"] = "empty"
-                        attempt_logs.append(log_entry)
+                    log_entry["status"] = "empty"
+                    attempt_logs.append(log_entry)
                 else:
                     errors.append(f"{desc}: 识别结果为空")
-                    if debug_session is not None:
-                        attempt_logs.append({
-                            "variant": desc,
-                            "variant_index": idx,
-                            "status": "empty",
-                        })
-            except Exception as e:
-                errors.append(f"{desc}: {e}")
-                if debug_session is not None:
                     attempt_logs.append({
                         "variant": desc,
                         "variant_index": idx,
-                        "error": str(e),
-                        "status": "error",
+                        "status": "empty",
                     })
+            except Exception as e:
+                errors.append(f"{desc}: {e}")
+                attempt_logs.append({
+                    "variant": desc,
+                    "variant_index": idx,
+                    "error": str(e),
+                    "status": "error",
+                })
                 continue
         
-        if debug_session is not None:
-            self._finalize_debug_session(
-                debug_session,
-                attempt_logs,
-                recognized_text=None,
-                success=False,
-                errors=errors,
-            )
+        self._finalize_debug_session(
+            debug_session,
+            pending_writes,
+            attempt_logs,
+            recognized_text=None,
+            success=False,
+            errors=errors,
+        )
         
-        raise ShowDocCaptchaError(
+        raise self._solve_failed_error(errors)
+
+    def _solve_failed_error(self, errors: List[str]) -> ShowDocCaptchaError:
+        return ShowDocCaptchaError(
             "验证码识别失败。尝试多种预处理仍失败。"
             + (" 详情: " + "; ".join(errors[:5]) if errors else "")
         )
 
+    def _clean_text(self, text: str) -> str:
+        """过滤掉不在白名单中的字符"""
+        if self._delete_bytes is not None:
+            # 白名单全是 ASCII，非 ASCII 字符必然被过滤，编码时直接丢弃
+            return text.encode("ascii", "ignore").translate(None, self._delete_bytes).decode("ascii")
+        whitelist_set = self._whitelist_set
+        return ''.join(c for c in text if c in whitelist_set)
+
+    def _classify_array(self, image: np.ndarray) -> str:
+        """
+        识别预处理后的图片数组
+        
+        优先直接传入 PIL 图片，省去 PNG 压缩编码再由 ddddocr 解码的开销；
+        旧版 ddddocr 不支持 PIL 图片时，改用无压缩的 BMP 字节。
+        """
+        if self._accepts_pil:
+            from PIL import Image
+            if len(image.shape) == 2:
+                pil_img = Image.fromarray(image)
+            else:
+                pil_img = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+            try:
+                return self.ocr.classification(pil_img)
+            except TypeError:
+                self._accepts_pil = False
+        
+        _, encoded = cv2.imencode('.bmp', image)
+        return self.ocr.classification(encoded.tobytes())
+
     def _normalize_result(self, text: str) -> str:
         normalized = text.strip().lower()
         return normalized[:4]
 
-    def _generate_variants(self, img: np.ndarray) -> list[tuple[np.ndarray, str]]:
-        variants: list[tuple[np.ndarray, str]] = []
+    def _generate_variants(self, img: np.ndarray) -> Iterator[tuple[np.ndarray, str]]:
+        """
+        按顺序逐个生成预处理变体（生成器）
         
+        识别成功后调用方停止迭代，后面的变体（包括开销最大的去噪）不会再计算。
+        """
         if len(img.shape) == 3:
             gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         else:
             gray = img.copy()
-        variants.append((gray, "gray"))
+        yield gray, "gray"
         
         denoised = cv2.fastNlMeansDenoising(gray, h=15)
-        variants.append((denoised, "denoised"))
+        yield denoised, "denoised"
         
         equalized = cv2.equalizeHist(denoised)
-        variants.append((equalized, "equalized"))
+        yield equalized, "equalized"
         
         _, binary_otsu = cv2.threshold(equalized, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        variants.append((binary_otsu, "binary_otsu"))
+        yield binary_otsu, "binary_otsu"
         
         binary_inv = cv2.bitwise_not(binary_otsu)
-        variants.append((binary_inv, "binary_inv"))
+        yield binary_inv, "binary_inv"
         
         adaptive = cv2.adaptiveThreshold(
             equalized, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
             cv2.THRESH_BINARY, 11, 2
         )
-        variants.append((adaptive, "adaptive"))
-        variants.append((cv2.bitwise_not(adaptive), "adaptive_inv"))
+        yield adaptive, "adaptive"
+        yield cv2.bitwise_not(adaptive), "adaptive_inv"
         
-        kernel_small = np.ones((2, 2), np.uint8)
-        opened = cv2.morphologyEx(binary_otsu, cv2.MORPH_OPEN, kernel_small, iterations=1)
-        variants.append((opened, "open_3x3"))
+        opened = cv2.morphologyEx(binary_otsu, cv2.MORPH_OPEN, _KERNEL_SMALL, iterations=1)
+        yield opened, "open_3x3"
         
-        closed = cv2.morphologyEx(binary_otsu, cv2.MORPH_CLOSE, kernel_small, iterations=1)
-        variants.append((closed, "close_3x3"))
+        closed = cv2.morphologyEx(binary_otsu, cv2.MORPH_CLOSE, _KERNEL_SMALL, iterations=1)
+        yield closed, "close_3x3"
         
-        kernel_med = np.ones((3, 3), np.uint8)
-        dilated = cv2.dilate(binary_otsu, kernel_med, iterations=1)
-        variants.append((dilated, "dilate_3x3"))
+        dilated = cv2.dilate(binary_otsu, _KERNEL_MED, iterations=1)
+        yield dilated, "dilate_3x3"
         
-        eroded = cv2.erode(binary_otsu, kernel_med, iterations=1)
-        variants.append((eroded, "erode_3x3"))
+        eroded = cv2.erode(binary_otsu, _KERNEL_MED, iterations=1)
+        yield eroded, "erode_3x3"
         
-        sharpen_kernel = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]])
-        sharpen = cv2.filter2D(equalized, -1, sharpen_kernel)
-        variants.append((sharpen, "sharpen"))
+        sharpen = cv2.filter2D(equalized, -1, _SHARPEN_KERNEL)
+        yield sharpen, "sharpen"
         
         scaled_eq = cv2.resize(equalized, None, fx=1.6, fy=1.6, interpolation=cv2.INTER_LINEAR)
-        variants.append((scaled_eq, "scaled_equalized"))
+        yield scaled_eq, "scaled_equalized"
         
         scaled_binary = cv2.resize(binary_otsu, None, fx=1.6, fy=1.6, interpolation=cv2.INTER_NEAREST)
-        variants.append((scaled_binary, "scaled_binary"))
-        
-        return variants
+        yield scaled_binary, "scaled_binary"
 
-    def _start_debug_session(self, original_img: np.ndarray) -> Path:
+    def _start_debug_session(self, original_img: np.ndarray, pending_writes: List[Future]) -> Path:
+        # 本进程第一次保存调试信息前，清理上次运行留下的旧文件
+        self._clean_debug_directory()
         root = Path(os.environ.get("SHOWDOC_CAPTCHA_DEBUG_DIR", "output/captcha_debug"))
         root.mkdir(parents=True, exist_ok=True)
         session_dir = root / f"captcha_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
         session_dir.mkdir(parents=True, exist_ok=True)
-        self._save_variant_image(session_dir, original_img, "original")
+        self._save_variant_image(session_dir, original_img, "original", pending_writes)
         return session_dir
 
-    def _save_variant_image(self, session_dir: Path, image: np.ndarray, name: str) -> None:
+    def _save_variant_image(
+        self,
+        session_dir: Path,
+        image: np.ndarray,
+        name: str,
+        pending_writes: List[Future],
+    ) -> None:
+        path = session_dir / f"{name}.png"
+        if self._io_pool is None:
+            self._write_image(path, image)
+            return
+        # 复制一份，避免写盘前缓冲区被调用方修改；任务记录到本次会话的列表中
+        pending_writes.append(self._io_pool.submit(self._write_image, path, image.copy()))
+
+    @staticmethod
+    def _write_image(path: Path, image: np.ndarray) -> None:
         try:
-            path = session_dir / f"{name}.png"
             if len(image.shape) == 2:
                 cv2.imwrite(str(path), image)
             else:
@@ -336,11 +462,15 @@ class SimpleCaptchaSolver:
     def _finalize_debug_session(
         self,
         session_dir: Path,
+        pending_writes: List[Future],
         attempt_logs: List[dict],
         recognized_text: Optional[str],
         success: bool,
         errors: Optional[List[str]] = None,
     ) -> None:
+        # 等待本次会话的图片写完，保证 metadata.json 最后落盘
+        if pending_writes:
+            wait(pending_writes)
         try:
             meta = {
                 "success": success,
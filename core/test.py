@@ -134,8 +134,10 @@ def export_json(api_tree, export_path=None, auto_export=False):
         export_dir.mkdir(parents=True, exist_ok=True)
     
     # 导出文件
+    # 先整体编码再一次写入：json.dump 会把 iterencode 产生的每个片段逐个 write
+    content = json.dumps(api_tree.to_dict(), ensure_ascii=False, indent=2)
     with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(api_tree.to_dict(), f, ensure_ascii=False, indent=2)
+        f.write(content)
     
     return filename
 
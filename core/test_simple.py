@@ -9,6 +9,7 @@ ShowDoc 客户端简化测试脚本
 import sys
 import os
 import json
+import tempfile
 from pathlib import Path
 
 # 设置控制台编码为 UTF-8（Windows）
@@ -31,6 +32,14 @@ if Path(__file__).parent.name == 'core':
 
 from core import ShowDocClient, ShowDocNotFoundError, ShowDocAuthError
 
+# 可选依赖：orjson（C 扩展，导出大节点树时明显快于标准库 json）
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
+
 
 # ========== 配置参数（请修改为你的实际参数）==========
 BASE_URL = "https://doc.cqfengli.com/web/#/110/6567"
@@ -51,21 +60,37 @@ EXPORT_PATH = None
 # False: 交互式询问是否导出（仅在交互式环境下）
 AUTO_EXPORT = True
 
+# JSON 导出后端（也可通过环境变量 SHOWDOC_JSON_BACKEND 指定）
+# "auto": 已安装 orjson 时使用 orjson，否则使用标准库 json
+# "orjson": 使用 orjson（未安装时回退到标准库 json）
+# "json": 始终使用标准库 json
+JSON_BACKEND = os.environ.get("SHOWDOC_JSON_BACKEND", "auto").strip().lower()
+
+# 导出格式控制
+# False: 紧凑 JSON（无缩进，文件更小、写出更快）
+# True: 缩进 2 格的格式化 JSON，便于人工阅读
+EXPORT_PRETTY = False
+
 # 是否显示详细的分类结构（True/False）
 SHOW_DETAILS = True
 # ====================================================
 
+# 预先生成的缩进字符串（按层级索引），避免每个节点重复计算 "  " * level
+_INDENT_LEVELS = 128
+_INDENTS = tuple("  " * i for i in range(_INDENT_LEVELS))
+
 
-def print_tree(category, level=0, max_pages=5, max_children=3):
-    """打印分类树结构"""
-    indent = "  " * level
+def _format_category(category, level, max_pages):
+    """生成单个分类（不含子分类）的输出文本，各行以换行结尾"""
+    indent = _INDENTS[level] if level < _INDENT_LEVELS else "  " * level
     cat_name = category.get("cat_name", "")
     cat_id = category.get("cat_id", "")
     cat_url = category.get("cat_url", "")
     
-    print(f"{indent}[分类] {cat_name} (ID: {cat_id})")
+    lines = [f"{indent}[分类] {cat_name} (ID: {cat_id})"]
+    append = lines.append
     if cat_url:
-        print(f"{indent}       URL: {cat_url}")
+        append(f"{indent}       URL: {cat_url}")
     
     # 显示页面
     pages = category.get("pages", [])
@@ -73,36 +98,117 @@ def print_tree(category, level=0, max_pages=5, max_children=3):
         page_title = page.get("page_title", "")
         page_id = page.get("page_id", "")
         page_url = page.get("page_url", "")
-        print(f"{indent}  [页面] {page_title} (ID: {page_id})")
+        append(f"{indent}  [页面] {page_title} (ID: {page_id})")
         if page_url:
-            print(f"{indent}       URL: {page_url}")
+            append(f"{indent}       URL: {page_url}")
     
     if len(pages) > max_pages:
-        print(f"{indent}  ... 还有 {len(pages) - max_pages} 个页面")
+        append(f"{indent}  ... 还有 {len(pages) - max_pages} 个页面")
     
-    # 递归显示子分类
-    children = category.get("children", [])
-    for child in children[:max_children]:
-        print_tree(child, level + 1, max_pages, max_children)
-    if len(children) > max_children:
-        print(f"{indent}  ... 还有 {len(children) - max_children} 个子分类")
+    append("")
+    return "\n".join(lines)
 
 
-def count_pages(category):
-    """递归统计页面数"""
-    total = len(category.get("pages", []))
-    for child in category.get("children", []):
-        total += count_pages(child)
+def walk_tree(categories, *, want_print=True, want_count=True,
+              max_categories=3, max_pages=5, max_children=3):
+    """一次遍历同时完成分类结构打印与页面统计
+    
+    依次打印前 max_categories 个分类的结构（每个分类最多 max_children 个子分类）；
+    未显示的分类及子分类只参与统计。
+    
+    Args:
+        categories: 顶层分类列表
+        want_print: 是否打印分类结构
+        want_count: 是否统计页面总数
+        max_categories: 最多显示的顶层分类数
+        max_pages: 每个分类最多显示的页面数
+        max_children: 每个分类最多显示的子分类数
+    
+    Returns:
+        页面总数（want_count 为 False 时返回 0）
+    """
+    # 输出先收集到列表，遍历结束后一次性写出
+    out = []
+    write = out.append
+    total = 0
+    shown = min(len(categories), max_categories) if want_print else 0
+    if not want_count:
+        categories = categories[:shown]
+    
+    # 栈元素为 (分类, 层级, 是否显示)；字符串元素为需要原样输出的提示行
+    stack = []
+    for i in range(len(categories) - 1, -1, -1):
+        if i < shown:
+            if i + 1 < shown:
+                stack.append(("", 0, True))
+            stack.append((categories[i], 0, True))
+            stack.append((f"\n分类 {i + 1}:", 0, True))
+        else:
+            stack.append((categories[i], 0, False))
+    
+    while stack:
+        node, level, visible = stack.pop()
+        if isinstance(node, str):
+            write(node + "\n")
+            continue
+        
+        children = node.get("children", ())
+        if want_count:
+            total += len(node.get("pages", ()))
+        if not visible:
+            stack.extend((child, level + 1, False) for child in children)
+            continue
+        
+        write(_format_category(node, level, max_pages))
+        
+        # 超出显示数量的子分类只统计；截断提示在显示的子分类之后输出
+        if len(children) > max_children:
+            if want_count:
+                stack.extend((child, level + 1, False) for child in children[max_children:])
+            indent = _INDENTS[level] if level < _INDENT_LEVELS else "  " * level
+            stack.append((f"{indent}  ... 还有 {len(children) - max_children} 个子分类", level, True))
+        for child in reversed(children[:max_children]):
+            stack.append((child, level + 1, True))
+    
+    if out:
+        sys.stdout.write("".join(out))
     return total
 
 
-def export_json(node_tree, export_path=None, auto_export=False):
+def _write_file_atomic(filename, data):
+    """先写入同目录临时文件再用 os.replace 替换目标文件，避免中途失败留下半个文件
+    
+    Args:
+        filename: 目标文件路径
+        data: 要写入的内容（str 按 UTF-8 写入，bytes 原样写入）
+    """
+    target_dir = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(dir=target_dir, prefix=".export-", suffix=".tmp")
+    try:
+        if isinstance(data, bytes):
+            with os.fdopen(fd, 'wb', buffering=1 << 20) as f:
+                f.write(data)
+        else:
+            with os.fdopen(fd, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.write(data)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def export_json(node_tree, export_path=None, auto_export=False, pretty=False):
     """导出 JSON 文件
     
     Args:
         node_tree: 节点树字典
         export_path: 导出路径，None 表示使用默认文件名（保存到 output/ 目录）
         auto_export: 是否自动导出，True 表示不询问直接导出
+        pretty: 是否缩进格式化输出；默认输出紧凑 JSON（体积更小，
+            且通过 json.dumps 一次性编码可走 json 模块的 C 编码器）
     
     Returns:
         导出文件的路径，如果未导出则返回 None
@@ -139,8 +245,21 @@ def export_json(node_tree, export_path=None, auto_export=False):
         export_dir.mkdir(parents=True, exist_ok=True)
     
     # 导出文件
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(node_tree, f, ensure_ascii=False, indent=2)
+    if HAS_ORJSON and JSON_BACKEND != "json":
+        # orjson 直接输出 UTF-8 字节（等同 ensure_ascii=False），紧凑格式与下方分隔符一致
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        _write_file_atomic(filename, orjson.dumps(node_tree, option=option))
+        return filename
+    
+    dump_kwargs = {"ensure_ascii": False}
+    if pretty:
+        dump_kwargs["indent"] = 2
+    else:
+        dump_kwargs["separators"] = (",", ":")
+    # json.dump 总是走纯 Python 的 iterencode；json.dumps 在无缩进时使用 C 编码器
+    _write_file_atomic(filename, json.dumps(node_tree, **dump_kwargs))
     
     return filename
 
@@ -181,26 +300,24 @@ def main():
         print(f"  - 分类数量: {len(node_tree.get('categories', []))}")
         print()
         
-        # 步骤4: 显示分类结构
+        # 步骤4: 显示分类结构（与步骤5 的页面统计在同一次遍历中完成）
+        categories = node_tree.get("categories", [])
         if SHOW_DETAILS:
             print("[步骤 4] 分类结构:")
-            categories = node_tree.get("categories", [])
+        # get_node_tree 已附带页面总数时直接使用，遍历只负责打印
+        total_pages = node_tree.get("total_pages")
+        counted_pages = walk_tree(categories, want_print=SHOW_DETAILS, want_count=total_pages is None,
+                                  max_categories=3, max_pages=5, max_children=3)
+        if total_pages is None:
+            total_pages = counted_pages
+        if SHOW_DETAILS:
             max_categories = 3 if len(categories) > 3 else len(categories)
-            for i, category in enumerate(categories[:max_categories], 1):
-                print(f"\n分类 {i}:")
-                print_tree(category, max_pages=5, max_children=3)
-                if i < max_categories:
-                    print()
-            
             if len(categories) > max_categories:
                 print(f"\n... 还有 {len(categories) - max_categories} 个分类")
             print()
         
         # 步骤5: 统计信息
         print("[步骤 5] 统计信息:")
-        total_pages = 0
-        for cat in node_tree.get("categories", []):
-            total_pages += count_pages(cat)
         
         print(f"  - 总分类数: {len(node_tree.get('categories', []))}")
         print(f"  - 总页面数: {total_pages}")
@@ -208,7 +325,7 @@ def main():
         
         # 步骤6: 导出 JSON
         print("[步骤 6] 导出数据")
-        export_file = export_json(node_tree, EXPORT_PATH, AUTO_EXPORT)
+        export_file = export_json(node_tree, EXPORT_PATH, AUTO_EXPORT, EXPORT_PRETTY)
         if export_file:
             print(f"  [OK] 已导出到: {export_file}")
         print()
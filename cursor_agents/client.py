@@ -4,10 +4,24 @@ Cursor Cloud Agents API 客户端
 """
 import json
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+
+# 读取缓存文件时优先使用更快的 orjson（可选依赖），未安装时使用标准库
+try:
+    from orjson import loads as _fast_loads
+except ImportError:
+    from json import loads as _fast_loads
+
+
+# 缓存未加载标记（与“文件不存在/读取失败”返回的 None 区分）
+_SENTINEL = object()
 
 
 class CursorAgentsClient:
@@ -19,6 +33,8 @@ class CursorAgentsClient:
     # 用户信息缓存文件（在项目 output 目录下）
     OUTPUT_DIR = Path.cwd() / "output"
     USER_INFO_FILE = OUTPUT_DIR / ".cursor_api_key_info.json"
+    # 缓存目录是否已在本进程中创建过（避免每次实例化都调用 mkdir）
+    _dirs_ensured = False
     
     def __init__(self, api_key: Optional[str] = None):
         """
@@ -27,50 +43,122 @@ class CursorAgentsClient:
         Args:
             api_key: API 密钥，如果为 None 则从缓存读取
         """
+        # 缓存文件内容的内存副本，首次读取时加载，保存时同步更新
+        self._api_key_cached: Any = _SENTINEL
+        self._user_info_cached: Any = _SENTINEL
+        
         self.api_key = api_key or self._load_api_key()
         if not self.api_key:
             raise ValueError("API Key 未设置，请先设置 API Key")
         
-        # 确保缓存目录存在
-        self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        self.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        # 确保缓存目录存在（每个进程只创建一次）
+        cls = type(self)
+        if not cls._dirs_ensured:
+            self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+            cls._dirs_ensured = True
+        
+        # 复用同一个 Session（HTTP keep-alive），避免每次请求重新建立 TCP/TLS 连接
+        self._session = requests.Session()
+        self._session.auth = HTTPBasicAuth(self.api_key, '')
+        
+        # 配置重试策略（重试耗尽后返回最后一次响应，由 raise_for_status 统一处理）
+        retry_strategy = Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[429, 502, 503, 504],
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=4,
+            pool_maxsize=8,
+        )
+        self._session.mount("https://", adapter)
+    
+    def close(self) -> None:
+        """关闭底层 HTTP 会话，释放连接池"""
+        self._session.close()
+    
+    def __enter__(self) -> "CursorAgentsClient":
+        return self
+    
+    def __exit__(self, *args) -> None:
+        self.close()
     
     def _load_api_key(self) -> Optional[str]:
-        """从缓存文件加载 API Key"""
-        if self.API_KEY_FILE.exists():
+        """从缓存文件加载 API Key（每个实例只读取一次文件）"""
+        if self._api_key_cached is not _SENTINEL:
+            return self._api_key_cached
+        
+        # 直接尝试打开（EAFP），省去一次 exists() 的 stat 调用
+        try:
+            with open(self.API_KEY_FILE, 'rb') as f:
+                api_key = _fast_loads(f.read()).get('api_key')
+        except Exception:
+            # 文件不存在（FileNotFoundError）或内容无效
+            api_key = None
+        self._api_key_cached = api_key
+        return api_key
+    
+    @staticmethod
+    def _write_json_atomic(path: Path, data: Any, **dump_kwargs) -> None:
+        """
+        原子写入 JSON 文件：先写入同目录临时文件，再用 os.replace 替换目标文件，
+        写入中途失败不会留下损坏的缓存文件
+        
+        Args:
+            path: 目标文件路径
+            data: 要写入的数据
+            **dump_kwargs: 传给 json.dumps 的参数
+        """
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.stem}-", suffix=".tmp")
+        except FileNotFoundError:
+            # 目录在进程运行期间被删除时重新创建
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.stem}-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(data, **dump_kwargs))
+            os.replace(tmp_path, path)
+        except BaseException:
             try:
-                with open(self.API_KEY_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get('api_key')
-            except Exception:
-                return None
-        return None
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
     
     def _save_api_key(self, api_key: str) -> None:
         """保存 API Key 到缓存文件"""
         try:
-            with open(self.API_KEY_FILE, 'w', encoding='utf-8') as f:
-                json.dump({'api_key': api_key}, f, indent=2)
+            self._write_json_atomic(self.API_KEY_FILE, {'api_key': api_key}, indent=2)
         except Exception as e:
             raise RuntimeError(f"保存 API Key 失败: {e}")
+        self._api_key_cached = api_key
     
     def _load_user_info(self) -> Optional[Dict[str, Any]]:
-        """从缓存文件加载用户信息"""
-        if self.USER_INFO_FILE.exists():
-            try:
-                with open(self.USER_INFO_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception:
-                return None
-        return None
+        """从缓存文件加载用户信息（每个实例只读取一次文件）"""
+        if self._user_info_cached is not _SENTINEL:
+            return self._user_info_cached
+        
+        # 直接尝试打开（EAFP），省去一次 exists() 的 stat 调用
+        try:
+            with open(self.USER_INFO_FILE, 'rb') as f:
+                user_info = _fast_loads(f.read())
+        except Exception:
+            # 文件不存在（FileNotFoundError）或内容无效
+            user_info = None
+        self._user_info_cached = user_info
+        return user_info
     
     def _save_user_info(self, user_info: Dict[str, Any]) -> None:
         """保存用户信息到缓存文件"""
         try:
-            with open(self.USER_INFO_FILE, 'w', encoding='utf-8') as f:
-                json.dump(user_info, f, indent=2, ensure_ascii=False)
+            self._write_json_atomic(self.USER_INFO_FILE, user_info, indent=2, ensure_ascii=False)
         except Exception as e:
             raise RuntimeError(f"保存用户信息失败: {e}")
+        self._user_info_cached = user_info
     
     def get_cached_user_info(self) -> Optional[Dict[str, Any]]:
         """
@@ -93,6 +181,7 @@ class CursorAgentsClient:
             包含设置结果的字典，如果获取了用户信息则包含 user_info 字段
         """
         self.api_key = api_key
+        self._session.auth = HTTPBasicAuth(api_key, '')
         self._save_api_key(api_key)
         
         result = {
@@ -138,15 +227,13 @@ class CursorAgentsClient:
             API 响应数据
         """
         url = f"{self.BASE_URL}{endpoint}"
-        auth = HTTPBasicAuth(self.api_key, '')
         
         try:
-            response = requests.request(
+            response = self._session.request(
                 method=method,
                 url=url,
                 params=params,
                 json=json_data,
-                auth=auth,
                 timeout=30
             )
             response.raise_for_status()
@@ -169,11 +256,37 @@ class CursorAgentsClient:
         Returns:
             包含 agents 列表和 nextCursor 的字典
         """
-        params = {'limit': min(limit, 100)}
+        params = {'limit': 100 if limit > 100 else limit}
         if cursor:
             params['cursor'] = cursor
         return self._request('GET', '/agents', params=params)
     
+    def iter_agents(self, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        逐个迭代所有云端代理（自动翻页）
+        
+        在调用方处理当前页时，后台线程已开始请求下一页，网络延迟与处理过程重叠。
+        
+        Args:
+            page_size: 每页请求的代理数量（最大 100）
+        
+        Yields:
+            单个代理信息字典
+        """
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            page = self.list_agents(limit=page_size)
+            while True:
+                next_cursor = page.get('nextCursor')
+                # 先提交下一页请求，再产出当前页
+                next_page = executor.submit(self.list_agents, page_size, next_cursor) if next_cursor else None
+                yield from page.get('agents', ())
+                if next_page is None:
+                    return
+                page = next_page.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
     def get_agent_status(self, agent_id: str) -> Dict[str, Any]:
         """
         获取云端 Agent 的当前状态和结果
@@ -218,11 +331,11 @@ class CursorAgentsClient:
         if images and len(images) > 5:
             raise ValueError("最多只能提供 5 张图片")
         
-        prompt = {'text': text}
+        payload = {'prompt': {'text': text}}
         if images:
-            prompt['images'] = images
+            payload['prompt']['images'] = images
         
-        return self._request('POST', f'/agents/{agent_id}/followup', json_data={'prompt': prompt})
+        return self._request('POST', f'/agents/{agent_id}/followup', json_data=payload)
     
     def delete_agent(self, agent_id: str) -> Dict[str, Any]:
         """
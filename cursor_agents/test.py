@@ -8,7 +8,8 @@ Cursor Cloud Agents API 客户端测试脚本
 """
 import sys
 import os
-import json
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 设置控制台编码为 UTF-8（Windows）
@@ -48,6 +49,16 @@ AUTO_SET_API_KEY = False
 # ====================================================
 
 
+# 摘要 / 消息的最大显示长度
+TRUNCATE_LENGTH = 100
+
+
+@functools.lru_cache(maxsize=1024)
+def _shorten(text, max_length=TRUNCATE_LENGTH):
+    """超过 max_length 时截断并追加 "..."（摘要在多页列表中常重复出现，结果缓存复用）"""
+    return text if len(text) <= max_length else f"{text[:max_length]}..."
+
+
 def print_user_info(user_info):
     """打印用户信息"""
     if not user_info:
@@ -60,13 +71,23 @@ def print_user_info(user_info):
     print(f"    用户邮箱: {user_info.get('userEmail', 'N/A')}")
 
 
-def print_agent_summary(agent):
-    """打印代理摘要信息"""
-    agent_id = agent.get('id', 'N/A')
-    name = agent.get('name', 'N/A')
-    status = agent.get('status', 'N/A')
+class _FallbackDict(dict):
+    """缺失的键格式化为 'N/A'，供 str.format_map 使用"""
     
-    print(f"    - [{status}] {name} (ID: {agent_id})")
+    def __missing__(self, key):
+        return 'N/A'
+
+
+# 代理摘要各部分的预编译模板（每行以换行结尾）
+_AGENT_HEADER_TEMPLATE = "    - [{status}] {name} (ID: {id})\n"
+_AGENT_SOURCE_TEMPLATE = "      源仓库: {repository} (ref: {ref})\n"
+_AGENT_TARGET_TEMPLATE = "      目标分支: {branchName}\n"
+_AGENT_TARGET_PR_TEMPLATE = "      目标分支: {branchName}\n      PR: {prUrl}\n"
+
+
+def format_agent_summary(agent):
+    """生成代理摘要信息文本（每行以换行结尾），便于批量输出"""
+    parts = [_AGENT_HEADER_TEMPLATE.format_map(_FallbackDict(agent))]
     
     if SHOW_DETAILS:
         source = agent.get('source', {})
@@ -74,26 +95,25 @@ def print_agent_summary(agent):
         summary = agent.get('summary', '')
         
         if source:
-            repo = source.get('repository', 'N/A')
-            ref = source.get('ref', 'N/A')
-            print(f"      源仓库: {repo} (ref: {ref})")
+            parts.append(_AGENT_SOURCE_TEMPLATE.format_map(_FallbackDict(source)))
         
         if target:
-            branch = target.get('branchName', 'N/A')
-            pr_url = target.get('prUrl', '')
-            if pr_url:
-                print(f"      目标分支: {branch}")
-                print(f"      PR: {pr_url}")
-            else:
-                print(f"      目标分支: {branch}")
+            template = _AGENT_TARGET_PR_TEMPLATE if target.get('prUrl') else _AGENT_TARGET_TEMPLATE
+            parts.append(template.format_map(_FallbackDict(target)))
         
         if summary:
-            summary_short = summary[:100] + "..." if len(summary) > 100 else summary
-            print(f"      摘要: {summary_short}")
+            parts.append(f"      摘要: {_shorten(summary)}\n")
         
         created_at = agent.get('createdAt', '')
         if created_at:
-            print(f"      创建时间: {created_at}")
+            parts.append(f"      创建时间: {created_at}\n")
+    
+    return "".join(parts)
+
+
+def print_agent_summary(agent):
+    """打印代理摘要信息"""
+    sys.stdout.write(format_agent_summary(agent))
 
 
 def main():
@@ -107,6 +127,9 @@ def main():
         # 步骤1: 初始化客户端
         print("[步骤 1] 初始化客户端...")
         
+        # 步骤1 中已获取到的用户信息，步骤2 直接复用，避免重复请求 /me
+        fetched_info = None
+        
         # 如果提供了 API_KEY，先设置
         if API_KEY:
             try:
@@ -114,6 +137,7 @@ def main():
                 client = CursorAgentsClient(api_key=API_KEY)
                 # 设置并缓存 API Key（会获取用户信息）
                 result = client.set_api_key(API_KEY, fetch_user_info=True)
+                fetched_info = result.get('user_info')
                 print("[OK] API Key 已设置并缓存")
                 if result.get('user_info'):
                     print_user_info(result['user_info'])
@@ -139,6 +163,7 @@ def main():
                     print("  - 提示: 未找到缓存的用户信息，将尝试获取...")
                     try:
                         user_info = client.get_api_key_info()
+                        fetched_info = user_info
                         print_user_info(user_info)
                     except Exception as e:
                         print(f"  - 警告: 获取用户信息失败: {e}")
@@ -152,10 +177,18 @@ def main():
         
         print()
         
+        # 步骤2~4 的三个 GET 请求互不依赖，并发发出以重叠网络延迟；
+        # 结果在各步骤中分别获取，错误信息仍按步骤输出
+        executor = ThreadPoolExecutor(max_workers=3)
+        api_key_info_future = None if fetched_info else executor.submit(client.get_api_key_info)
+        models_future = executor.submit(client.list_models)
+        agents_future = executor.submit(client.list_agents, 10)
+        executor.shutdown(wait=False)
+        
         # 步骤2: 获取 API Key 信息
         print("[步骤 2] 获取 API Key 信息...")
         try:
-            api_key_info = client.get_api_key_info()
+            api_key_info = fetched_info or api_key_info_future.result()
             print("[OK] 成功获取")
             print_user_info(api_key_info)
         except Exception as e:
@@ -165,7 +198,7 @@ def main():
         # 步骤3: 列出推荐模型
         print("[步骤 3] 获取推荐模型列表...")
         try:
-            models_result = client.list_models()
+            models_result = models_future.result()
             models = models_result.get('models', [])
             print(f"[OK] 成功获取 ({len(models)} 个模型)")
             if models:
@@ -182,7 +215,7 @@ def main():
         agents = []
         print("[步骤 4] 列出所有云端代理...")
         try:
-            agents_result = client.list_agents(limit=10)
+            agents_result = agents_future.result()
             agents = agents_result.get('agents', [])
             next_cursor = agents_result.get('nextCursor')
             
@@ -190,9 +223,8 @@ def main():
             
             if agents:
                 print("  - 代理列表:")
-                for agent in agents:
-                    print_agent_summary(agent)
-                    print()
+                # 所有代理的摘要拼接后一次性写出（每个代理后空一行）
+                sys.stdout.write("".join(format_agent_summary(agent) + "\n" for agent in agents))
                 
                 if next_cursor:
                     print(f"  - 提示: 还有更多代理，使用 cursor={next_cursor} 获取下一页")
@@ -259,7 +291,7 @@ def main():
                         for i, msg in enumerate(messages[:max_show], 1):
                             msg_type = msg.get('type', 'unknown')
                             text = msg.get('text', '')
-                            text_short = text[:100] + "..." if len(text) > 100 else text
+                            text_short = _shorten(text)
                             
                             if msg_type == 'user_message':
                                 print(f"    {i}. [用户] {text_short}")
@@ -305,23 +337,25 @@ def main():
         api_key_file = client.API_KEY_FILE
         user_info_file = client.USER_INFO_FILE
         
+        # 每个文件只检查一次是否存在
+        api_key_present = api_key_file.is_file()
+        user_info_present = user_info_file.is_file()
+        
         print(f"  - API Key 缓存: {api_key_file}")
-        if api_key_file.exists():
+        if api_key_present:
             print("    ✓ 已缓存")
         else:
             print("    ✗ 未缓存")
         
         print(f"  - 用户信息缓存: {user_info_file}")
-        if user_info_file.exists():
+        if user_info_present:
             print("    ✓ 已缓存")
             if SHOW_DETAILS:
-                try:
-                    with open(user_info_file, 'r', encoding='utf-8') as f:
-                        cached_info = json.load(f)
-                        print(f"    - API Key 名称: {cached_info.get('apiKeyName', 'N/A')}")
-                        print(f"    - 用户邮箱: {cached_info.get('userEmail', 'N/A')}")
-                except Exception:
-                    pass
+                # 客户端保存时已同步内存副本，无需再次读取文件
+                cached_info = client.get_cached_user_info()
+                if isinstance(cached_info, dict):
+                    print(f"    - API Key 名称: {cached_info.get('apiKeyName', 'N/A')}")
+                    print(f"    - 用户邮箱: {cached_info.get('userEmail', 'N/A')}")
         else:
             print("    ✗ 未缓存")
         print()
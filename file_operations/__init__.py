@@ -33,6 +33,7 @@ from .safe_writer import SafeFileWriter
 
 from .content_processor import (
     read_file_safe,
+    read_file_mmap,
     write_file_safe,
     replace_content,
     merge_files,
@@ -105,8 +106,11 @@ from .file_comparison import (
 
 from .content_analyzer import (
     count_lines,
+    count_lines_many,
+    count_lines_bytes,
     analyze_file_size,
     search_text,
+    search_text_bytes,
 )
 
 from .temp_manager import (
@@ -116,6 +120,7 @@ from .temp_manager import (
 
 from .backup_manager import (
     backup_file,
+    backup_files,
     restore_file,
 )
 
@@ -158,6 +163,7 @@ __all__ = [
     "SafeFileWriter",
     # 内容处理
     "read_file_safe",
+    "read_file_mmap",
     "write_file_safe",
     "replace_content",
     "merge_files",
@@ -210,13 +216,17 @@ __all__ = [
     "get_file_hash",
     # 内容分析
     "count_lines",
+    "count_lines_many",
+    "count_lines_bytes",
     "analyze_file_size",
     "search_text",
+    "search_text_bytes",
     # 临时文件
     "create_temp_file",
     "create_temp_directory",
     # 备份恢复
     "backup_file",
+    "backup_files",
     "restore_file",
     # 文件验证
     "detect_encoding",
@@ -4,13 +4,45 @@
 提供文件自动备份、带时间戳的备份、备份管理等功能。
 """
 
+import hashlib
+import mmap
+import os
+import re
 import shutil
+import tarfile
+from fnmatch import fnmatch
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 from .exceptions import FileOperationError, BackupError
-from .file_utils import get_file_info
+from .file_utils import _fastcopy, _COPY_BUFSIZE
+
+# 可选依赖：xxhash 计算内容摘要更快，未安装时使用 hashlib.blake2b
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# 可选依赖：zstandard 用于 .tar.zst 归档备份
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# 归档备份的压缩算法及对应的文件后缀
+_ARCHIVE_SUFFIXES = {"zstd": ".tar.zst", "gz": ".tar.gz", "none": ".tar"}
+
+# backup_files 生成的归档文件名：backup_{时间戳}{归档后缀}（普通备份名中含 .backup 等后缀，不会匹配）
+_ARCHIVE_NAME_RE = re.compile(
+    r"backup_[^.]+(?:" + "|".join(re.escape(suffix) for suffix in _ARCHIVE_SUFFIXES.values()) + r")"
+)
+
+# 达到该大小的文件用 mmap 计算摘要，避免整个读入内存
+_MMAP_HASH_MIN_SIZE = 10 * 1024 * 1024
 
 
 def backup_file(
@@ -18,6 +50,7 @@ def backup_file(
     backup_dir: Optional[str | Path] = None,
     suffix: str = ".backup",
     timestamp_format: str = "%Y%m%d_%H%M%S",
+    skip_if_unchanged: bool = True,
 ) -> Path:
     """
     备份文件
@@ -27,6 +60,7 @@ def backup_file(
         backup_dir: 备份目录（如果为 None 则在原文件同目录）
         suffix: 备份文件后缀
         timestamp_format: 时间戳格式
+        skip_if_unchanged: 内容与最新备份相同时不再复制，直接返回最新备份
     
     Returns:
         备份文件路径
@@ -50,30 +84,212 @@ def backup_file(
     else:
         backup_dir_path = path.parent
     
+    # 内容未变化时复用最新备份（先比较大小，大小相同再比较内容摘要）；
+    # list_backups 按通配符匹配，可能包含其他文件的备份（如 foo.txt 匹配到 foo_bar 的备份），这里只取名称完全对应的
+    if skip_if_unchanged:
+        backups = [
+            backup
+            for backup in list_backups(path, backup_dir=backup_dir_path, suffix=suffix)
+            if _is_backup_name_of(Path(backup["path"]).name, path, suffix, timestamp_format)
+        ]
+        if backups:
+            latest = backups[0]
+            try:
+                source_stat = path.stat()
+                if source_stat.st_size == latest["size"]:
+                    latest_stat = os.stat(latest["path"])
+                    source_digest = _file_digest(str(path), _stat_signature(source_stat))
+                    latest_digest = _file_digest(latest["path"], _stat_signature(latest_stat))
+                    if source_digest == latest_digest:
+                        return Path(latest["path"])
+            except OSError:
+                pass
+    
     # 生成备份文件名
     timestamp = datetime.now().strftime(timestamp_format)
     backup_name = f"{path.stem}_{timestamp}{suffix}{path.suffix}"
     backup_path = backup_dir_path / backup_name
     
     try:
-        shutil.copy2(path, backup_path)
+        _fastcopy(path, backup_path)
         return backup_path
     except Exception as e:
         raise BackupError(f"备份文件失败: {e}")
 
 
+def _is_backup_name_of(
+    backup_name: str,
+    path: Path,
+    suffix: str,
+    timestamp_format: str,
+) -> bool:
+    """备份文件名是否恰好为 {stem}_{时间戳}{suffix}{扩展名}（时间戳需符合 timestamp_format）"""
+    match = re.fullmatch(
+        rf"{re.escape(path.stem)}_(.+){re.escape(suffix)}{re.escape(path.suffix)}",
+        backup_name,
+    )
+    if not match:
+        return False
+    try:
+        datetime.strptime(match.group(1), timestamp_format)
+    except ValueError:
+        return False
+    return True
+
+
+def backup_files(
+    file_paths: List[str | Path],
+    archive_dir: str | Path,
+    algo: str = "zstd",
+    timestamp_format: str = "%Y%m%d_%H%M%S",
+) -> Path:
+    """
+    将多个文件备份到一个归档中
+    
+    大量小文件逐个备份时，每个备份都要创建文件和目录项；写入单个归档
+    可以把这些开销合并成少量大块写入，压缩后也更节省空间。
+    
+    Args:
+        file_paths: 要备份的文件路径列表
+        archive_dir: 归档所在目录
+        algo: 压缩算法（zstd / gz / none），zstd 需要安装 zstandard
+        timestamp_format: 时间戳格式
+    
+    Returns:
+        归档文件路径（归档内的文件名为相对于各文件公共目录的路径）
+    
+    Raises:
+        FileNotFoundError: 文件不存在
+        BackupError: 备份失败
+    """
+    if algo not in _ARCHIVE_SUFFIXES:
+        raise BackupError(f"不支持的压缩算法: {algo}")
+    if algo == "zstd" and not ZSTD_AVAILABLE:
+        raise BackupError("未安装 zstandard，请运行: pip install zstandard")
+    
+    paths = [Path(file_path).absolute() for file_path in file_paths]
+    if not paths:
+        raise FileOperationError("没有要备份的文件")
+    for path in paths:
+        if not path.exists():
+            raise FileNotFoundError(f"文件不存在: {path}")
+        if not path.is_file():
+            raise FileOperationError(f"路径不是文件: {path}")
+    
+    # 归档内路径相对于公共目录；无公共目录（如 Windows 下跨盘符）时只保留文件名
+    try:
+        base_dir = os.path.commonpath([str(path.parent) for path in paths])
+        arcnames = [os.path.relpath(path, base_dir) for path in paths]
+    except ValueError:
+        arcnames = [path.name for path in paths]
+    
+    archive_dir_path = Path(archive_dir)
+    archive_dir_path.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime(timestamp_format)
+    archive_path = archive_dir_path / f"backup_{timestamp}{_ARCHIVE_SUFFIXES[algo]}"
+    
+    try:
+        if algo == "zstd":
+            with open(archive_path, "wb") as raw, \
+                    zstandard.ZstdCompressor(level=3, threads=-1).stream_writer(raw) as writer, \
+                    tarfile.open(fileobj=writer, mode="w|") as tf:
+                for path, arcname in zip(paths, arcnames):
+                    tf.add(path, arcname=arcname, recursive=False)
+        else:
+            mode = "w|gz" if algo == "gz" else "w|"
+            with tarfile.open(str(archive_path), mode=mode) as tf:
+                for path, arcname in zip(paths, arcnames):
+                    tf.add(path, arcname=arcname, recursive=False)
+        return archive_path
+    except Exception as e:
+        try:
+            archive_path.unlink()
+        except OSError:
+            pass
+        raise BackupError(f"备份文件失败: {e}")
+
+
+def _open_archive(archive: Path):
+    """以流模式打开备份归档（按后缀识别压缩算法）"""
+    if archive.name.endswith(_ARCHIVE_SUFFIXES["zstd"]):
+        if not ZSTD_AVAILABLE:
+            raise BackupError("未安装 zstandard，请运行: pip install zstandard")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(archive, "rb"), closefd=True)
+        return tarfile.open(fileobj=reader, mode="r|"), reader
+    mode = "r|gz" if archive.name.endswith(_ARCHIVE_SUFFIXES["gz"]) else "r|"
+    return tarfile.open(str(archive), mode=mode), None
+
+
+def _restore_from_archive(
+    archive: Path,
+    target_path: Optional[str | Path],
+    overwrite: bool,
+    member: Optional[str],
+) -> Path:
+    """从 backup_files 生成的归档中恢复单个文件"""
+    try:
+        if member is None:
+            # 未指定成员时归档中只能有一个文件
+            tf, reader = _open_archive(archive)
+            try:
+                names = [info.name for info in tf if info.isfile()]
+            finally:
+                tf.close()
+                if reader is not None:
+                    reader.close()
+            if len(names) != 1:
+                raise BackupError(f"归档中包含 {len(names)} 个文件，请指定要恢复的 member")
+            member = names[0]
+        
+        member = member.replace(os.sep, "/")
+        if os.path.isabs(member) or ".." in member.split("/"):
+            raise BackupError(f"不安全的归档成员路径: {member}")
+        
+        target = Path(target_path) if target_path else archive.parent / member
+        if target.exists() and not overwrite:
+            raise FileOperationError(f"目标文件已存在: {target}")
+        
+        tf, reader = _open_archive(archive)
+        try:
+            for info in tf:
+                if info.name != member or not info.isfile():
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with tf.extractfile(info) as src, open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst, _COPY_BUFSIZE)
+                # 与 shutil.copy2 一致，恢复修改时间和权限
+                os.utime(target, (info.mtime, info.mtime))
+                os.chmod(target, info.mode & 0o7777)
+                return target
+        finally:
+            tf.close()
+            if reader is not None:
+                reader.close()
+        raise BackupError(f"归档中不存在文件: {member}")
+    except (BackupError, FileOperationError):
+        raise
+    except Exception as e:
+        raise BackupError(f"恢复文件失败: {e}")
+
+
 def restore_file(
     backup_path: str | Path,
     target_path: Optional[str | Path] = None,
     overwrite: bool = False,
+    member: Optional[str] = None,
+    archive: Optional[bool] = None,
 ) -> Path:
     """
     从备份恢复文件
     
     Args:
-        backup_path: 备份文件路径
-        target_path: 目标文件路径（如果为 None 则从备份文件名推断）
+        backup_path: 备份文件路径（也可以是 backup_files 生成的 .tar.zst / .tar.gz / .tar 归档）
+        target_path: 目标文件路径（如果为 None 则从备份文件名推断；
+            归档则为归档所在目录下的成员路径）
         overwrite: 是否覆盖已存在的文件
+        member: 要从归档中恢复的文件（归档内路径），归档只包含一个文件时可省略
+        archive: 备份是否为 backup_files 生成的归档（None 表示按文件名
+            backup_{时间戳}.tar.zst / .tar.gz / .tar 判断）
     
     Returns:
         恢复后的文件路径
@@ -87,6 +303,11 @@ def restore_file(
     if not backup.exists():
         raise FileNotFoundError(f"备份文件不存在: {backup}")
     
+    if archive is None:
+        archive = _ARCHIVE_NAME_RE.fullmatch(backup.name) is not None
+    if archive:
+        return _restore_from_archive(backup, target_path, overwrite, member)
+    
     # 确定目标路径
     if target_path:
         target = Path(target_path)
@@ -113,12 +334,55 @@ def restore_file(
         raise FileOperationError(f"目标文件已存在: {target}")
     
     try:
-        shutil.copy2(backup, target)
+        if target.is_dir():
+            # 目标是已存在的目录时保持 shutil 的行为（复制到该目录下）
+            shutil.copy2(backup, target)
+        else:
+            _fastcopy(backup, target)
         return target
     except Exception as e:
         raise BackupError(f"恢复文件失败: {e}")
 
 
+def _stat_signature(stat_info: os.stat_result) -> tuple:
+    """
+    文件签名，用作缓存键
+    
+    包含 inode 和 ctime：SafeFileWriter 写入时会保留原文件的 mtime，仅凭 mtime/size
+    无法发现内容变化。
+    """
+    return stat_info.st_ino, stat_info.st_mtime_ns, stat_info.st_ctime_ns, stat_info.st_size
+
+
+@lru_cache(maxsize=4096)
+def _file_digest(path: str, signature: tuple) -> str:
+    """
+    计算文件内容摘要（按路径与文件签名缓存，文件变化后自动失效）
+    
+    Returns:
+        十六进制摘要字符串
+    """
+    hasher = xxhash.xxh64() if XXHASH_AVAILABLE else hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if signature[-1] >= _MMAP_HASH_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hasher.update(mm)
+        else:
+            hasher.update(f.read())
+    return hasher.hexdigest()
+
+
+@lru_cache(maxsize=4096)
+def _backup_info(path: str, mtime_ns: int, ctime: float, size: int) -> tuple:
+    """
+    生成备份文件信息（按路径与 mtime/ctime/size 缓存，文件变化后自动失效）
+    
+    Returns:
+        (路径, 创建时间 ISO 字符串, 大小) 元组
+    """
+    return path, datetime.fromtimestamp(ctime).isoformat(), size
+
+
 def list_backups(
     file_path: str | Path,
     backup_dir: Optional[str | Path] = None,
@@ -152,14 +416,24 @@ def list_backups(
     backups = []
     base_name = path.stem
     
-    # 查找所有匹配的备份文件
-    for backup_file in backup_dir_path.glob(f"{base_name}_*{suffix}{path.suffix}"):
+    # 查找所有匹配的备份文件：直接用目录项的 stat 结果，不再对每个文件单独调用 get_file_info
+    backup_pattern = f"{base_name}_*{suffix}{path.suffix}"
+    try:
+        with os.scandir(backup_dir_path) as it:
+            entries = [entry for entry in it if fnmatch(entry.name, backup_pattern)]
+    except OSError:
+        return []
+    
+    for entry in entries:
         try:
-            info = get_file_info(backup_file)
+            stat_info = entry.stat()
+            backup_path, created_time, size = _backup_info(
+                entry.path, stat_info.st_mtime_ns, stat_info.st_ctime, stat_info.st_size
+            )
             backups.append({
-                "path": str(backup_file),
-                "created_time": info.get("created_time"),
-                "size": info["size"],
+                "path": backup_path,
+                "created_time": created_time,
+                "size": size,
             })
         except Exception:
             continue
@@ -4,28 +4,58 @@
 支持批量复制、移动、删除、重命名等操作，带进度显示和中断处理。
 """
 
+import codecs
+import mmap
+import os
 import signal
+import stat
 import sys
 import shutil
 import re
+import string
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
 from pathlib import Path
-from typing import List, Optional, Callable, Dict, Any, Generator
-from fnmatch import fnmatch
+from typing import List, Optional, Callable, Dict, Any, Generator, Pattern, Tuple
+from fnmatch import translate
+from functools import lru_cache
 
 from .exceptions import FileOperationError, OperationCancelledError
 from .file_utils import copy_file, move_file, delete_file, rename_file
 from .content_processor import replace_content
 
 
-# 全局中断标志
-_interrupted = False
+# 全局中断标志（Event 在工作线程间可见，无需 global 声明）
+_interrupted = threading.Event()
+
+# 批量循环每处理 256 个文件检查一次中断标志（i & 0xff == 0 时检查）
+_INTERRUPT_CHECK_MASK = 0xff
+
+# I/O 密集型批量操作的最大线程数
+_MAX_IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# 批量复制时每批提交的任务数（一批全部完成后再提交下一批，限制同时存在的任务对象数量）
+_COPY_BATCH_SIZE = 4096
+
+# 使用进程池的最小文件数和文件总大小：进程启动开销较大（Windows 上用 spawn 启动更慢），
+# 文件少或内容少时并行收益抵不过启动开销，直接串行处理
+_PROCESS_POOL_MIN_FILES = 1000
+_PROCESS_POOL_MIN_BYTES = 64 * 1024 * 1024
+
+# 达到该大小的文件在替换前先用 mmap 检查是否包含要替换的文本
+_MMAP_PREFILTER_MIN_SIZE = 10 * 1024 * 1024
+
+# UTF-16/32 编码的文件中 ASCII 文本不是原样字节，不能按字节预检查
+_WIDE_BOMS = (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE, codecs.BOM_UTF32_BE)
 
 
 def _signal_handler(sig, frame):
     """中断信号处理"""
-    global _interrupted
-    _interrupted = True
-    print("\n⚠️  收到中断信号，将在当前任务完成后退出...")
+    _interrupted.set()
+    # os.write 是异步信号安全的，不经过 print 的锁和 stdio 缓冲
+    os.write(2, "\n⚠️  收到中断信号，将在当前任务完成后退出...\n".encode("utf-8"))
 
 
 # 注册信号处理器
@@ -36,11 +66,142 @@ if hasattr(signal, 'SIGTERM'):
 
 def _check_interrupted():
     """检查是否被中断"""
-    global _interrupted
-    if _interrupted:
+    if _interrupted.is_set():
         raise OperationCancelledError("操作被用户中断")
 
 
+def _make_matcher(pattern: Optional[str]) -> Optional[Callable[[str], Any]]:
+    """将文件名模式预编译为正则匹配函数（与 fnmatch 一致：Windows 下不区分大小写）"""
+    if pattern is None:
+        return None
+    flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+    return re.compile(translate(pattern), flags).match
+
+
+def _as_str(path: str | Path) -> str:
+    """返回路径字符串（已经是 str 时直接返回，不构造 Path）"""
+    return path if isinstance(path, str) else os.fspath(path)
+
+
+def _classify(path: str | Path) -> Optional[str]:
+    """
+    用一次 os.stat 判断路径类型（跟随符号链接，与 exists/is_file/is_dir 一致）
+    
+    Returns:
+        "file"、"dir"、"other"，路径不存在或无法访问时返回 None
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except (OSError, ValueError):
+        return None
+    if stat.S_ISREG(mode):
+        return "file"
+    if stat.S_ISDIR(mode):
+        return "dir"
+    return "other"
+
+
+def _walk_dir(root: str, rel_root: str, matcher: Optional[Callable[[str], Any]]) -> List[Tuple[str, str]]:
+    """
+    用 os.scandir 迭代遍历目录树（不跟随目录符号链接，与 Path.rglob 一致）
+    
+    Returns:
+        (文件路径, 相对路径) 列表
+    """
+    results = []
+    stack = [(root, rel_root)]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append((entry.path, rel_path))
+                elif entry.is_file() and (matcher is None or matcher(entry.name)):
+                    results.append((entry.path, rel_path))
+            except OSError:
+                continue
+        # 逆序入栈，保持目录内的遍历顺序
+        stack.extend(reversed(subdirs))
+    return results
+
+
+def _collect_files(
+    source_paths: List[str | Path],
+    pattern: Optional[str] = None,
+    recursive: bool = True,
+) -> List[Tuple[str, str]]:
+    """
+    收集源路径中匹配模式的文件
+    
+    目录的每个一级子目录交给线程池并行遍历，重叠目录读取和 stat 的等待时间；
+    结果保持原有顺序。路径全程使用字符串和 os.path，不为每个文件构造 Path。
+    
+    Args:
+        source_paths: 源文件/目录路径列表
+        pattern: 文件名模式，None 表示全部文件
+        recursive: 是否递归遍历目录（False 时忽略目录）
+    
+    Returns:
+        (文件路径, 相对路径) 列表；直接指定的文件相对路径为文件名，
+        目录中的文件相对路径相对于该目录
+    """
+    matcher = _make_matcher(pattern)
+    files = []
+    
+    with ThreadPoolExecutor(max_workers=_MAX_IO_WORKERS) as executor:
+        for source in source_paths:
+            source_str = _as_str(source)
+            kind = _classify(source_str)
+            
+            if kind == "file":
+                name = os.path.basename(source_str)
+                if matcher is None or matcher(name):
+                    files.append((source_str, name))
+            elif kind == "dir" and recursive:
+                try:
+                    with os.scandir(source_str) as it:
+                        entries = list(it)
+                except OSError:
+                    continue
+                # 一级子目录并行遍历；文件与子目录结果按目录项顺序合并
+                parts = []
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            parts.append(executor.submit(_walk_dir, entry.path, entry.name, matcher))
+                        elif entry.is_file() and (matcher is None or matcher(entry.name)):
+                            parts.append([(entry.path, entry.name)])
+                    except OSError:
+                        continue
+                for part in parts:
+                    files.extend(part if isinstance(part, list) else part.result())
+    return files
+
+
+def _copy_after(
+    previous: Future,
+    source_file: str,
+    dest_file: str,
+    overwrite: bool,
+    preserve_metadata: bool,
+) -> Path:
+    """
+    等待复制到同一目标的上一个任务结束后再复制（保持与串行复制相同的覆盖顺序）
+    
+    线程池按提交顺序取任务，上一个任务此时已在其他线程执行或已结束，等待不会死锁。
+    """
+    wait([previous])
+    _check_interrupted()
+    return copy_file(source_file, dest_file, overwrite=overwrite, preserve_metadata=preserve_metadata)
+
+
 def batch_copy(
     source_paths: List[str | Path],
     destination: str | Path,
@@ -70,43 +231,67 @@ def batch_copy(
     dest_dir = Path(destination)
     dest_dir.mkdir(parents=True, exist_ok=True)
     
-    # 收集所有要复制的文件
-    files_to_copy = []
-    for source in source_paths:
-        source_path = Path(source)
-        if not source_path.exists():
-            continue
-        
-        if source_path.is_file():
-            if pattern is None or fnmatch(source_path.name, pattern):
-                files_to_copy.append((source_path, dest_dir / source_path.name))
-        elif source_path.is_dir():
-            # 递归查找目录中的文件
-            for file_path in source_path.rglob("*"):
-                if file_path.is_file():
-                    if pattern is None or fnmatch(file_path.name, pattern):
-                        relative_path = file_path.relative_to(source_path)
-                        dest_file = dest_dir / relative_path
-                        files_to_copy.append((file_path, dest_file))
-    
-    # 执行复制
+    # 先收集所有文件，进度回调的总数从一开始就确定
+    files_to_copy = _collect_files(source_paths, pattern)
+    total_count = len(files_to_copy)
+    
+    # 复制任务交给线程池并行执行（文件复制是 I/O 密集型操作）；计数与进度回调都在当前线程处理，
+    # 按文件顺序在提交复制任务前调用回调。目标路径直接拼接字符串，由 copy_file 转换为 Path
+    dest_root = os.fspath(dest_dir)
     success_count = 0
     failed_count = 0
     failed_files = []
-    total_count = len(files_to_copy)
     
-    for i, (source_file, dest_file) in enumerate(files_to_copy, 1):
-        try:
-            _check_interrupted()
-            
-            if progress_callback:
-                progress_callback(i, total_count, str(source_file))
+    with ThreadPoolExecutor(max_workers=_MAX_IO_WORKERS) as executor:
+        interrupted = False
+        for batch_start in range(0, total_count, _COPY_BATCH_SIZE):
+            batch = []
+            # 本批中每个目标路径最后提交的复制任务：多个源文件复制到同一目标时按顺序依次执行，
+            # 最后一个生效（之前的批次已全部完成，不必再等待）
+            last_by_dest = {}
+            for i, (source_file, relative_path) in enumerate(
+                files_to_copy[batch_start:batch_start + _COPY_BATCH_SIZE], batch_start + 1
+            ):
+                # 每 256 个文件检查一次中断标志；中断后剩余文件都记为失败
+                if not (i - 1) & _INTERRUPT_CHECK_MASK:
+                    interrupted = _interrupted.is_set()
+                if interrupted:
+                    batch.append((source_file, None))
+                    continue
+                
+                if progress_callback:
+                    progress_callback(i, total_count, str(source_file))
+                
+                dest_file = os.path.join(dest_root, relative_path)
+                dest_key = os.path.normcase(dest_file)
+                previous = last_by_dest.get(dest_key)
+                if previous is None:
+                    future = executor.submit(
+                        copy_file, source_file, dest_file,
+                        overwrite=overwrite, preserve_metadata=preserve_metadata,
+                    )
+                else:
+                    future = executor.submit(
+                        _copy_after, previous, source_file, dest_file, overwrite, preserve_metadata,
+                    )
+                last_by_dest[dest_key] = future
+                batch.append((source_file, future))
             
-            copy_file(source_file, dest_file, overwrite=overwrite, preserve_metadata=preserve_metadata)
-            success_count += 1
-        except Exception as e:
-            failed_count += 1
-            failed_files.append({"source": str(source_file), "error": str(e)})
+            # 按文件顺序收集本批结果；收到中断信号后取消尚未开始的复制任务
+            for source_file, future in batch:
+                if future is not None and _interrupted.is_set():
+                    future.cancel()
+                if future is None or future.cancelled():
+                    failed_count += 1
+                    failed_files.append({"source": str(source_file), "error": "操作被用户中断"})
+                    continue
+                
+                try:
+                    future.result()
+                    success_count += 1
+                except Exception as e:
+                    failed_count += 1
+                    failed_files.append({"source": str(source_file), "error": str(e)})
     
     return {
         "success_count": success_count,
@@ -139,23 +324,12 @@ def batch_move(
     dest_dir = Path(destination)
     dest_dir.mkdir(parents=True, exist_ok=True)
     
-    # 收集所有要移动的文件
-    files_to_move = []
-    for source in source_paths:
-        source_path = Path(source)
-        if not source_path.exists():
-            continue
-        
-        if source_path.is_file():
-            if pattern is None or fnmatch(source_path.name, pattern):
-                files_to_move.append((source_path, dest_dir / source_path.name))
-        elif source_path.is_dir():
-            for file_path in source_path.rglob("*"):
-                if file_path.is_file():
-                    if pattern is None or fnmatch(file_path.name, pattern):
-                        relative_path = file_path.relative_to(source_path)
-                        dest_file = dest_dir / relative_path
-                        files_to_move.append((file_path, dest_file))
+    # 收集所有要移动的文件；目标路径直接拼接字符串，由 move_file 转换为 Path
+    dest_root = os.fspath(dest_dir)
+    files_to_move = [
+        (file_path, os.path.join(dest_root, relative_path))
+        for file_path, relative_path in _collect_files(source_paths, pattern)
+    ]
     
     # 执行移动
     success_count = 0
@@ -163,9 +337,14 @@ def batch_move(
     failed_files = []
     total_count = len(files_to_move)
     
+    interrupted = False
     for i, (source_file, dest_file) in enumerate(files_to_move, 1):
         try:
-            _check_interrupted()
+            # 每 256 个文件检查一次中断标志；检测到中断后其余文件都记为中断
+            if not (i - 1) & _INTERRUPT_CHECK_MASK:
+                interrupted = _interrupted.is_set()
+            if interrupted:
+                raise OperationCancelledError("操作被用户中断")
             
             if progress_callback:
                 progress_callback(i, total_count, str(source_file))
@@ -203,20 +382,9 @@ def batch_delete(
         操作结果字典
     """
     # 收集所有要删除的文件
-    files_to_delete = []
-    for file_path in file_paths:
-        path = Path(file_path)
-        if not path.exists():
-            continue
-        
-        if path.is_file():
-            if pattern is None or fnmatch(path.name, pattern):
-                files_to_delete.append(path)
-        elif path.is_dir() and recursive:
-            for file_path in path.rglob("*"):
-                if file_path.is_file():
-                    if pattern is None or fnmatch(file_path.name, pattern):
-                        files_to_delete.append(file_path)
+    files_to_delete = [
+        path for path, _ in _collect_files(file_paths, pattern, recursive=recursive)
+    ]
     
     # 执行删除
     success_count = 0
@@ -224,9 +392,14 @@ def batch_delete(
     failed_files = []
     total_count = len(files_to_delete)
     
+    interrupted = False
     for i, file_path in enumerate(files_to_delete, 1):
         try:
-            _check_interrupted()
+            # 每 256 个文件检查一次中断标志；检测到中断后其余文件都记为中断
+            if not (i - 1) & _INTERRUPT_CHECK_MASK:
+                interrupted = _interrupted.is_set()
+            if interrupted:
+                raise OperationCancelledError("操作被用户中断")
             
             if progress_callback:
                 progress_callback(i, total_count, str(file_path))
@@ -245,6 +418,47 @@ def batch_delete(
     }
 
 
+# 名称模板字段到生成代码中表达式的映射（i 为序号，p 为文件 Path）
+_TEMPLATE_FIELD_EXPRS = {"index": "i", "name": "p.name", "stem": "p.stem", "suffix": "p.suffix"}
+_TEMPLATE_CONVERSIONS = {"s": "str", "r": "repr", "a": "ascii"}
+
+
+@lru_cache(maxsize=128)
+def _compile_name_template(name_template: str) -> Optional[Callable[[int, Path], str]]:
+    """
+    将名称模板编译为 (序号, 文件路径) -> 新文件名 的函数，避免每个文件都经过 str.format 解析模板
+    
+    例如 "{stem}_{index}{suffix}" 编译为
+    lambda i, p: format(p.stem, "") + "_" + format(i, "") + format(p.suffix, "")。
+    
+    Returns:
+        编译后的函数；模板包含属性/索引访问、嵌套格式说明或未知字段时返回 None，
+        由调用方回退到 str.format（保持原有的结果与错误）
+    """
+    try:
+        parsed = list(string.Formatter().parse(name_template))
+    except ValueError:
+        return None
+    
+    parts = []
+    for literal, field_name, format_spec, conversion in parsed:
+        if literal:
+            parts.append(repr(literal))
+        if field_name is None:
+            continue
+        expr = _TEMPLATE_FIELD_EXPRS.get(field_name)
+        if expr is None or (format_spec and "{" in format_spec):
+            return None
+        if conversion:
+            if conversion not in _TEMPLATE_CONVERSIONS:
+                return None
+            expr = f"{_TEMPLATE_CONVERSIONS[conversion]}({expr})"
+        parts.append(f"format({expr}, {format_spec!r})")
+    
+    source = f"lambda i, p: {' + '.join(parts) or repr('')}"
+    return eval(source, {"__builtins__": {}, "format": format, "str": str, "repr": repr, "ascii": ascii})
+
+
 def batch_rename(
     file_paths: List[str | Path],
     rename_func: Optional[Callable[[Path], str]] = None,
@@ -267,20 +481,32 @@ def batch_rename(
     Returns:
         操作结果字典
     """
-    files_to_rename = []
-    for file_path in file_paths:
-        path = Path(file_path)
-        if path.exists() and path.is_file():
-            files_to_rename.append(path)
+    files_to_rename = [Path(file_path) for file_path in file_paths if _classify(file_path) == "file"]
     
     success_count = 0
     failed_count = 0
     failed_files = []
     total_count = len(files_to_rename)
     
+    # 循环外预处理：模板编译为函数，正则只编译一次
+    template_func = _compile_name_template(name_template) if not rename_func and name_template else None
+    regex_sub = None
+    regex_error = None
+    if not rename_func and not name_template and pattern and replacement is not None:
+        try:
+            regex_sub = re.compile(pattern).sub
+        except re.error as e:
+            # 与逐个调用 re.sub 一致：每个文件都记录该错误
+            regex_error = e
+    
+    interrupted = False
     for i, file_path in enumerate(files_to_rename, 1):
         try:
-            _check_interrupted()
+            # 每 256 个文件检查一次中断标志；检测到中断后其余文件都记为中断
+            if not (i - 1) & _INTERRUPT_CHECK_MASK:
+                interrupted = _interrupted.is_set()
+            if interrupted:
+                raise OperationCancelledError("操作被用户中断")
             
             if progress_callback:
                 progress_callback(i, total_count, str(file_path))
@@ -289,14 +515,16 @@ def batch_rename(
             if rename_func:
                 new_name = rename_func(file_path)
             elif name_template:
-                new_name = name_template.format(
-                    index=i,
-                    name=file_path.name,
-                    stem=file_path.stem,
-                    suffix=file_path.suffix,
-                )
+                if template_func is not None:
+                    new_name = template_func(i, file_path)
+                else:
+                    new_name = name_template.format(
+                        index=i, name=file_path.name, stem=file_path.stem, suffix=file_path.suffix,
+                    )
             elif pattern and replacement is not None:
-                new_name = re.sub(pattern, replacement, file_path.name)
+                if regex_error is not None:
+                    raise regex_error
+                new_name = regex_sub(replacement, file_path.name)
             else:
                 raise FileOperationError("必须提供 rename_func、name_template 或 pattern/replacement")
             
@@ -314,6 +542,126 @@ def batch_rename(
     }
 
 
+def _prefilter_needle(old_text: str | Pattern, regex: bool) -> Optional[bytes]:
+    """
+    返回可用于按字节预检查的文本（仅限不含换行符的 ASCII 普通文本），否则返回 None
+    
+    ASCII 文本在 UTF-8、GBK 等兼容 ASCII 的编码中按原样字节存储，文件字节中找不到
+    它时解码后的内容里也一定没有；含换行符的文本受换行符转换影响，不能预检查。
+    """
+    if regex or not isinstance(old_text, str) or not old_text or not old_text.isascii():
+        return None
+    if "\n" in old_text or "\r" in old_text:
+        return None
+    return old_text.encode("ascii")
+
+
+def _may_contain(file_path: str | Path, needle: bytes) -> bool:
+    """用 mmap 检查大文件中是否可能包含 needle（无法确定时返回 True）"""
+    try:
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _MMAP_PREFILTER_MIN_SIZE:
+                return True
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:4].startswith(_WIDE_BOMS):
+                    return True
+                return mm.find(needle) != -1
+    except (OSError, ValueError):
+        return True
+
+
+def _reaches_total_size(files: List[str], min_bytes: int) -> bool:
+    """文件总大小是否达到 min_bytes（累计到阈值即停止，无法访问的文件按 0 计算）"""
+    total = 0
+    for file_path in files:
+        try:
+            total += os.stat(file_path).st_size
+        except OSError:
+            continue
+        if total >= min_bytes:
+            return True
+    return False
+
+
+def _replace_in_file(
+    file_path: str | Path,
+    old_text: str | Pattern,
+    new_text: str,
+    regex: bool,
+    needle: Optional[bytes] = None,
+) -> Tuple[int, Optional[str]]:
+    """
+    替换单个文件的内容（可在子进程中执行，异常转换为错误信息返回）
+    
+    Args:
+        needle: 预检查用的字节串；大文件中不包含它时直接跳过，省去编码检测和整文件解码
+    
+    Returns:
+        (替换次数, 错误信息)，成功时错误信息为 None
+    """
+    try:
+        if needle is not None and not _may_contain(file_path, needle):
+            return 0, None
+        return replace_content(file_path, old_text, new_text, regex=regex), None
+    except Exception as e:
+        return 0, str(e)
+
+
+def _iter_replace_results(
+    files: List[str],
+    old_text: str | Pattern,
+    new_text: str,
+    regex: bool,
+) -> Generator[Tuple[str, int, Optional[str]], None, None]:
+    """
+    按文件顺序产出替换结果 (文件路径, 替换次数, 错误信息)
+    
+    文件数量和总大小都较大时用进程池并行处理（正则替换是 CPU 密集型，多进程可绕过 GIL）；
+    进程池无法启动时回退到串行处理。收到中断信号后，尚未处理的文件标记为中断。
+    """
+    needle = _prefilter_needle(old_text, regex)
+    if len(files) >= _PROCESS_POOL_MIN_FILES and _reaches_total_size(files, _PROCESS_POOL_MIN_BYTES):
+        workers = os.cpu_count() or 1
+        chunksize = max(1, len(files) // (workers * 4))
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            results = executor.map(
+                _replace_in_file, files, repeat(old_text), repeat(new_text), repeat(regex), repeat(needle),
+                chunksize=chunksize,
+            )
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            # 任务尚未执行，可安全地改为串行处理全部文件
+            executor = None
+        
+        if executor is not None:
+            with executor:
+                for index, file_path in enumerate(files):
+                    if _interrupted.is_set():
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        for remaining in files[index:]:
+                            yield remaining, 0, "操作被用户中断"
+                        return
+                    try:
+                        count, error = next(results)
+                    except BrokenProcessPool as e:
+                        # 已提交的任务可能部分执行过，不能重试（替换不一定幂等）
+                        for remaining in files[index:]:
+                            yield remaining, 0, f"替换进程异常退出: {e}"
+                        return
+                    yield file_path, count, error
+            return
+    
+    interrupted = False
+    for index, file_path in enumerate(files):
+        if not index & _INTERRUPT_CHECK_MASK:
+            interrupted = _interrupted.is_set()
+        if interrupted:
+            yield file_path, 0, "操作被用户中断"
+            continue
+        count, error = _replace_in_file(file_path, old_text, new_text, regex, needle)
+        yield file_path, count, error
+
+
 def batch_replace_content(
     file_paths: List[str | Path],
     old_text: str,
@@ -336,12 +684,12 @@ def batch_replace_content(
     Returns:
         操作结果字典
     """
+    matcher = _make_matcher(pattern)
     files_to_process = []
     for file_path in file_paths:
-        path = Path(file_path)
-        if path.exists() and path.is_file():
-            if pattern is None or fnmatch(path.name, pattern):
-                files_to_process.append(path)
+        path = _as_str(file_path)
+        if _classify(path) == "file" and (matcher is None or matcher(os.path.basename(path))):
+            files_to_process.append(path)
     
     success_count = 0
     failed_count = 0
@@ -349,19 +697,25 @@ def batch_replace_content(
     total_count = len(files_to_process)
     total_replacements = 0
     
-    for i, file_path in enumerate(files_to_process, 1):
+    # 正则只编译一次，编译结果传给每个文件的替换（replace_content 直接接受 Pattern）
+    if regex and isinstance(old_text, str):
         try:
-            _check_interrupted()
-            
-            if progress_callback:
-                progress_callback(i, total_count, str(file_path))
-            
-            count = replace_content(file_path, old_text, new_text, regex=regex)
+            old_text = re.compile(old_text)
+        except re.error:
+            # 保持原有行为：由每个文件的替换各自报告该错误
+            pass
+    
+    results = _iter_replace_results(files_to_process, old_text, new_text, regex)
+    for i, (file_path, count, error) in enumerate(results, 1):
+        if progress_callback:
+            progress_callback(i, total_count, str(file_path))
+        
+        if error is None:
             total_replacements += count
             success_count += 1
-        except Exception as e:
+        else:
             failed_count += 1
-            failed_files.append({"file": str(file_path), "error": str(e)})
+            failed_files.append({"file": str(file_path), "error": error})
     
     return {
         "success_count": success_count,
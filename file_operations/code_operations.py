@@ -4,21 +4,121 @@
 提供在代码文件中插入、替换、删除、提取代码块的功能。
 """
 
+import ast
 import re
+from bisect import bisect_right
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Tuple, Dict, Any
+from typing import Optional, List, Tuple, Dict, Any, Pattern
 
 from .exceptions import FileOperationError
-from .content_processor import read_file_safe
+from .content_processor import read_file_safe, _content_cache, _line_starts, _line_offset, _line_count, _line_slice
 from .safe_writer import SafeFileWriter
 
 
+# 使用 ast 解析函数/类范围的 Python 文件后缀
+_PYTHON_SUFFIXES = {".py", ".pyi", ".pyw"}
+
+# 用 # 作为行注释的语言（其他语言中 # 可能是私有字段、属性或预处理指令，不能当作注释）
+_HASH_COMMENT_SUFFIXES = {
+    ".py", ".pyi", ".pyw", ".sh", ".bash", ".zsh", ".rb", ".pl", ".r",
+    ".yaml", ".yml", ".toml", ".ps1", ".cmake", ".nim", ".cr", ".ex", ".exs",
+}
+
+# 单引号不表示字符串、只用于单个字符字面量的语言（如 Rust 中 'a 是生命周期）
+_CHAR_LITERAL_SUFFIXES = {".rs"}
+
+
+@lru_cache(maxsize=64)
+def _block_token_re(suffix: str) -> Pattern:
+    """
+    括号匹配时识别的记号：注释、字符串（其中的括号不计数）、括号和换行
+    
+    注释和字符串的写法按文件后缀选择，按后缀缓存。
+    """
+    if suffix in _HASH_COMMENT_SUFFIXES:
+        comments = r"|#[^\n]*"
+    else:
+        comments = r"|//[^\n]*|/\*[\s\S]*?\*/"
+    if suffix in _CHAR_LITERAL_SUFFIXES:
+        quoted = r"|'(?:\\[^'\n]+|[^'\\\n])'"
+    else:
+        quoted = r"|'(?:\\.|[^'\\\n])*'"
+    return re.compile(
+        r'"""[\s\S]*?"""' r"|'''[\s\S]*?'''"
+        + comments
+        + r'|"(?:\\.|[^"\\\n])*"'
+        + quoted
+        + r"|`(?:\\.|[^`\\])*`"
+        r"|[{}()\n]"
+    )
+
+# 声明行之后（跳过空白）紧跟的 {
+_NEXT_BRACE_RE = re.compile(r"\s*\{")
+
+
+@_content_cache(size_of_result=True)
+def _read_cached(
+    path_str: str,
+    signature: Tuple[int, int, int, int],
+    encoding: Optional[str],
+) -> str:
+    """
+    读取文件内容（按路径与文件签名缓存，文件变化后自动失效；按内容的总字符数限制缓存大小）
+    
+    签名包含 inode 和 ctime：SafeFileWriter 写入时会保留原文件的 mtime，仅凭 mtime/size
+    无法发现内容变化。
+    """
+    return read_file_safe(path_str, encoding=encoding)
+
+
+def _read_content(path: Path, encoding: Optional[str] = None) -> str:
+    """读取文件内容（查找代码块后再修改文件时不必重复解码）"""
+    stat_info = path.stat()
+    signature = (stat_info.st_ino, stat_info.st_mtime_ns, stat_info.st_ctime_ns, stat_info.st_size)
+    return _read_cached(str(path), signature, encoding)
+
+
+def _line_number(content: str, pos: int) -> int:
+    """字符位置所在的行号（从1开始），在行索引上二分查找，不再切片统计换行数"""
+    return bisect_right(_line_starts(content), pos)
+
+
+# 函数声明的写法，按优先级排列（与合并正则中的命名分组对应）
+_FN_KINDS = ("py", "js", "kt", "br")
+
+
+@lru_cache(maxsize=256)
+def _fn_pattern(name: str) -> Pattern:
+    """
+    函数声明的正则（支持 Python、JavaScript、Kotlin、Dart 等），按函数名缓存
+    
+    各种写法合并为一个带命名分组的正则，一次扫描即可找到所有候选位置，
+    由匹配到的分组（match.lastgroup）区分写法。
+    """
+    escaped = re.escape(name)
+    # 整体放在零宽前瞻中：匹配不消耗字符，某种写法的匹配不会遮住从其内部开始的其他写法
+    return re.compile(
+        rf"(?=def\s+(?P<py>{escaped})\s*\("
+        rf"|function\s+(?P<js>{escaped})\s*\("
+        rf"|fun\s+(?P<kt>{escaped})\s*\("
+        rf"|(?P<br>{escaped})\s*\([^)]*\)\s*{{)"
+    )
+
+
+@lru_cache(maxsize=256)
+def _class_pattern(name: str) -> Pattern:
+    """类声明的正则，按类名缓存"""
+    return re.compile(rf"class\s+{re.escape(name)}")
+
+
 def find_code_block(
     file_path: str | Path,
     marker: Optional[str] = None,
     function_name: Optional[str] = None,
     class_name: Optional[str] = None,
     line_range: Optional[Tuple[int, int]] = None,
+    encoding: Optional[str] = None,
 ) -> Optional[Dict[str, Any]]:
     """
     查找代码块
@@ -29,6 +129,7 @@ def find_code_block(
         function_name: 函数名
         class_name: 类名
         line_range: 行号范围 (start_line, end_line)
+        encoding: 文件编码（如果为 None 则自动检测）
     
     Returns:
         代码块信息字典，包含：
@@ -45,16 +146,16 @@ def find_code_block(
     if not path.exists():
         raise FileNotFoundError(f"文件不存在: {path}")
     
-    content = read_file_safe(path)
-    lines = content.splitlines(keepends=True)
+    content = _read_content(path, encoding)
     
-    # 按行号范围查找
+    # 按行号范围查找：只统计行数并按行的起始位置切出所需的行，不拆分整个文件
     if line_range:
         start_line, end_line = line_range
-        if 1 <= start_line <= len(lines) and 1 <= end_line <= len(lines):
+        line_count = _line_count(content)
+        if 1 <= start_line <= line_count and 1 <= end_line <= line_count:
             start_idx = start_line - 1
             end_idx = end_line
-            block_content = "".join(lines[start_idx:end_idx])
+            block_content = _line_slice(content, start_idx, end_idx)
             return {
                 "start_line": start_line,
                 "end_line": end_line,
@@ -70,7 +171,7 @@ def find_code_block(
         start_line = None
         end_line = None
         
-        for i, line in enumerate(lines, 1):
+        for i, line in enumerate(_split_lines(content), 1):
             if start_marker in line:
                 start_line = i + 1  # 标记后的下一行
             elif end_marker in line and start_line is not None:
@@ -80,7 +181,7 @@ def find_code_block(
         if start_line and end_line:
             start_idx = start_line - 1
             end_idx = end_line
-            block_content = "".join(lines[start_idx:end_idx])
+            block_content = _line_slice(content, start_idx, end_idx)
             return {
                 "start_line": start_line,
                 "end_line": end_line,
@@ -88,100 +189,180 @@ def find_code_block(
             }
         return None
     
-    # 按函数名查找
-    if function_name:
-        # 简单的函数查找（支持 Python、JavaScript、Kotlin、Dart 等）
-        patterns = [
-            rf"def\s+{re.escape(function_name)}\s*\(",
-            rf"function\s+{re.escape(function_name)}\s*\(",
-            rf"fun\s+{re.escape(function_name)}\s*\(",
-            rf"{re.escape(function_name)}\s*\([^)]*\)\s*{{",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, content)
-            if match:
-                start_pos = match.start()
-                start_line = content[:start_pos].count("\n") + 1
-                
-                # 查找函数结束位置（简单实现，查找匹配的大括号或缩进）
-                # 这里使用简化版本，实际应该使用 AST 解析
-                end_line = _find_function_end(content, start_pos)
-                
-                if end_line:
-                    start_idx = start_line - 1
-                    end_idx = end_line
-                    block_content = "".join(lines[start_idx:end_idx])
-                    return {
-                        "start_line": start_line,
-                        "end_line": end_line,
-                        "content": block_content,
-                    }
+    # Python 文件用 ast 确定函数/类的范围，结果准确且不受字符串和注释中的括号影响
+    if (function_name or class_name) and path.suffix.lower() in _PYTHON_SUFFIXES:
+        kind, name = ("function", function_name) if function_name else ("class", class_name)
+        block_range = _find_python_block(content, kind, name)
+        if block_range:
+            start_line, end_line = block_range
+            return {
+                "start_line": start_line,
+                "end_line": end_line,
+                "content": _line_slice(content, start_line - 1, end_line),
+            }
+    
+    # 按函数名或类名查找
+    if function_name or class_name:
+        suffix = path.suffix.lower()
+        if function_name:
+            block_range = _find_function_block(content, function_name, suffix)
+        else:
+            block_range = _find_class_block(content, class_name, suffix)
+        if block_range:
+            start_line, end_line = block_range
+            start_idx = start_line - 1
+            end_idx = end_line
+            block_content = _line_slice(content, start_idx, end_idx)
+            return {
+                "start_line": start_line,
+                "end_line": end_line,
+                "content": block_content,
+            }
         return None
     
-    # 按类名查找
-    if class_name:
-        pattern = rf"class\s+{re.escape(class_name)}"
-        match = re.search(pattern, content)
-        if match:
-            start_pos = match.start()
-            start_line = content[:start_pos].count("\n") + 1
-            
-            # 查找类结束位置
-            end_line = _find_class_end(content, start_pos)
-            
+    return None
+
+
+@_content_cache()
+def _find_function_block(content: str, name: str, suffix: str = "") -> Optional[Tuple[int, int]]:
+    """
+    用正则查找函数的行号范围，按内容、函数名和文件后缀缓存（查找后再替换/删除/插入时不必重新扫描）
+    
+    简单的函数查找（支持 Python、JavaScript、Kotlin、Dart 等）：
+    一次扫描记录每种写法的第一个匹配，再按写法的优先级依次尝试。
+    """
+    first_matches = {}
+    for match in _fn_pattern(name).finditer(content):
+        first_matches.setdefault(match.lastgroup, match.start())
+        if match.lastgroup == _FN_KINDS[0]:
+            break
+    
+    for kind in _FN_KINDS:
+        start_pos = first_matches.get(kind)
+        if start_pos is not None:
+            # 查找函数结束位置（匹配的大括号或缩进）
+            end_line = _find_function_end(content, start_pos, suffix)
             if end_line:
-                start_idx = start_line - 1
-                end_idx = end_line
-                block_content = "".join(lines[start_idx:end_idx])
-                return {
-                    "start_line": start_line,
-                    "end_line": end_line,
-                    "content": block_content,
-                }
+                return _line_number(content, start_pos), end_line
+    return None
+
+
+@_content_cache()
+def _find_class_block(content: str, name: str, suffix: str = "") -> Optional[Tuple[int, int]]:
+    """用正则查找类的行号范围，按内容、类名和文件后缀缓存"""
+    match = _class_pattern(name).search(content)
+    if match:
+        start_pos = match.start()
+        # 查找类结束位置
+        end_line = _find_class_end(content, start_pos, suffix)
+        if end_line:
+            return _line_number(content, start_pos), end_line
+    return None
+
+
+@_content_cache()
+def _python_definitions(content: str) -> Optional[Dict[Tuple[str, str], Tuple[int, int]]]:
+    """
+    用 ast 解析 Python 源码中的函数和类（同名时取源码中最靠前的定义）
+    
+    Returns:
+        {(类型, 名称): (起始行号, 结束行号)}，类型为 "function" 或 "class"；
+        无法解析时返回 None
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
         return None
     
-    return None
+    definitions = {}
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            key = ("function", node.name)
+        elif isinstance(node, ast.ClassDef):
+            key = ("class", node.name)
+        else:
+            continue
+        # ast.walk 按广度优先遍历，同名定义保留行号最小的一个（与正则查找一致）
+        if key not in definitions or node.lineno < definitions[key][0]:
+            definitions[key] = (node.lineno, node.end_lineno)
+    return definitions
+
 
+def _find_python_block(content: str, kind: str, name: str) -> Optional[Tuple[int, int]]:
+    """查找 Python 函数/类的行号范围，无法解析或未找到时返回 None"""
+    definitions = _python_definitions(content)
+    if definitions is None:
+        return None
+    return definitions.get((kind, name))
 
-def _find_function_end(content: str, start_pos: int) -> Optional[int]:
-    """查找函数结束行号（简化实现）"""
-    # 这是一个简化实现，实际应该使用 AST
-    lines = content.splitlines(keepends=True)
-    start_line = content[:start_pos].count("\n")
+
+def _find_function_end(content: str, start_pos: int, suffix: str = "") -> Optional[int]:
+    """
+    查找函数结束行号（suffix 为小写的文件后缀，决定注释和字符串的写法）
     
-    # 查找第一个非空行的缩进
+    从函数声明处按记号扫描（跳过字符串和注释中的括号）：声明后跟 { 时返回与之匹配的 }
+    所在行；声明行结束时仍未遇到 { 的（如 Python、Kotlin 表达式函数体），按缩进判断结束位置。
+    """
+    start_line = _line_number(content, start_pos) - 1
+    paren_depth = 0
+    brace_depth = 0
+    line = start_line
+    
+    for match in _block_token_re(suffix).finditer(content, start_pos):
+        token = match.group()
+        if token == "(":
+            paren_depth += 1
+        elif token == ")":
+            paren_depth -= 1
+        elif token == "{":
+            if paren_depth <= 0:
+                brace_depth += 1
+        elif token == "}":
+            if paren_depth <= 0 and brace_depth > 0:
+                brace_depth -= 1
+                if brace_depth == 0:
+                    return line + 1
+        elif token == "\n":
+            line += 1
+            # 声明已结束但函数体不以 { 开始（允许 { 单独位于下一行）
+            if brace_depth == 0 and paren_depth <= 0 and not _NEXT_BRACE_RE.match(content, match.end()):
+                return _find_indented_block_end(content, start_line)
+        else:
+            # 多行字符串/注释中的换行也要计入行号
+            line += token.count("\n")
+    
+    if brace_depth == 0:
+        return _find_indented_block_end(content, start_line)
+    return _line_count(content)
+
+
+@_content_cache()
+def _split_lines(content: str) -> Tuple[str, ...]:
+    """按行拆分的结果（不含换行符），按内容缓存"""
+    return tuple(content.splitlines())
+
+
+def _find_indented_block_end(content: str, start_line: int) -> Optional[int]:
+    """按缩进查找代码块结束行号（块内最后一个非空行，start_line 从 0 开始）"""
+    lines = _split_lines(content)
     if start_line >= len(lines):
         return None
     
     base_indent = len(lines[start_line]) - len(lines[start_line].lstrip())
-    brace_count = 0
-    paren_count = 0
-    
-    for i in range(start_line, len(lines)):
+    end_line = start_line + 1
+    for i in range(start_line + 1, len(lines)):
         line = lines[i]
-        for char in line:
-            if char == "{":
-                brace_count += 1
-            elif char == "}":
-                brace_count -= 1
-            elif char == "(":
-                paren_count += 1
-            elif char == ")":
-                paren_count -= 1
-        
-        # 如果大括号和括号都匹配，且缩进回到基础缩进，可能是函数结束
-        if i > start_line and brace_count == 0 and paren_count == 0:
-            current_indent = len(line) - len(line.lstrip())
-            if current_indent <= base_indent and line.strip():
-                return i + 1
-    
-    return len(lines)
+        if not line.strip():
+            continue
+        if len(line) - len(line.lstrip()) <= base_indent:
+            break
+        end_line = i + 1
+    return end_line
 
 
-def _find_class_end(content: str, start_pos: int) -> Optional[int]:
-    """查找类结束行号（简化实现）"""
-    return _find_function_end(content, start_pos)
+def _find_class_end(content: str, start_pos: int, suffix: str = "") -> Optional[int]:
+    """查找类结束行号"""
+    return _find_function_end(content, start_pos, suffix)
 
 
 def insert_code_block(
@@ -223,14 +404,14 @@ def insert_code_block(
         writer.insert_lines(code, line_number)
     elif marker:
         # 在标记后插入
-        block_info = find_code_block(path, marker=marker)
+        block_info = find_code_block(path, marker=marker, encoding=encoding)
         if block_info:
             writer.insert_lines(code, block_info["end_line"] + 1)
         else:
             raise FileOperationError(f"未找到标记: {marker}")
     elif after_function:
         # 在函数后插入
-        block_info = find_code_block(path, function_name=after_function)
+        block_info = find_code_block(path, function_name=after_function, encoding=encoding)
         if block_info:
             writer.insert_lines(code, block_info["end_line"] + 1)
         else:
@@ -238,9 +419,8 @@ def insert_code_block(
     elif position is not None:
         writer.insert(code, position)
     else:
-        # 默认追加到文件末尾
-        content = read_file_safe(path, encoding=encoding)
-        writer.write(content + "\n" + code)
+        # 默认追加到文件末尾（追加模式只写入新代码，不读取和重写原内容）
+        writer.write("\n" + code, mode="append")
     
     return path
 
@@ -285,21 +465,22 @@ def replace_code_block(
         function_name=function_name,
         class_name=class_name,
         line_range=line_range,
+        encoding=encoding,
     )
     
     if not block_info:
         raise FileOperationError("未找到要替换的代码块")
     
     # 读取文件内容
-    content = read_file_safe(path, encoding=encoding)
-    lines = content.splitlines(keepends=True)
+    content = _read_content(path, encoding)
     
-    # 替换代码块
+    # 替换代码块：按行的起始位置直接拼接原文本
     start_idx = block_info["start_line"] - 1
     end_idx = block_info["end_line"]
     
-    new_lines = lines[:start_idx] + [new_code + "\n" if not new_code.endswith("\n") else new_code] + lines[end_idx:]
-    new_content = "".join(new_lines)
+    if not new_code.endswith("\n"):
+        new_code += "\n"
+    new_content = content[:_line_offset(content, start_idx)] + new_code + content[_line_offset(content, end_idx):]
     
     # 写入文件
     writer = SafeFileWriter(path, encoding=encoding, backup=True)
@@ -346,14 +527,22 @@ def delete_code_block(
         function_name=function_name,
         class_name=class_name,
         line_range=line_range,
+        encoding=encoding,
     )
     
     if not block_info:
         raise FileOperationError("未找到要删除的代码块")
     
-    # 使用 content_processor 的 delete_lines
-    from .content_processor import delete_lines
-    return delete_lines(path, block_info["start_line"], block_info["end_line"], encoding=encoding)
+    # 删除代码块所在的行（与 content_processor.delete_lines 相同，但复用已缓存的内容）
+    content = _read_content(path, encoding)
+    start_idx = max(0, block_info["start_line"] - 1)
+    end_idx = max(0, block_info["end_line"])
+    new_content = content[:_line_offset(content, start_idx)] + content[_line_offset(content, end_idx):]
+    
+    writer = SafeFileWriter(path, encoding=encoding, backup=True)
+    writer.write(new_content)
+    
+    return path
 
 
 def extract_code_block(
@@ -397,6 +586,7 @@ def extract_code_block(
         function_name=function_name,
         class_name=class_name,
         line_range=line_range,
+        encoding=encoding,
     )
     
     if not block_info:
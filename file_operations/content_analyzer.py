@@ -4,13 +4,143 @@
 提供代码行数统计、文件大小分析、全文搜索等功能。
 """
 
+import codecs
+import os
 import re
+from bisect import bisect_right
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Pattern
+from typing import Dict, Any, List, Optional, Pattern, Tuple
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
 
 # 使用内置异常
-from .content_processor import read_file_safe
+from .exceptions import EncodingError
+from .content_processor import read_file_safe, read_file_mmap, _iter_text_blocks, _line_starts, _EXTRA_LINE_BREAK_RE
+
+
+def _compile_comment_patterns(markers: str) -> Tuple[Pattern, Pattern]:
+    """编译注释行的正则：逐行匹配的版本和对整个文本批量统计的多行版本"""
+    # 多行版本用 [^\S\n]（不含换行的空白），匹配不会跨行
+    return (
+        re.compile(rf'^\s*(?:{markers})'),
+        re.compile(rf'^[^\S\n]*(?:{markers})', re.MULTILINE),
+    )
+
+
+# 简单的注释检测（支持 Python、JavaScript、Kotlin、Dart 等），合并为一个正则，每行只匹配一次：
+# Python 单行注释 #、JavaScript/Kotlin/Dart 单行注释 //、多行注释中的行 *
+_COMMENT_RE, _COMMENT_LINE_RE = _compile_comment_patterns(r'#|//|\*')
+
+# 按文件后缀选择注释写法（未列出的后缀使用上面合并的正则）
+_HASH_COMMENT_PATTERNS = _compile_comment_patterns(r'#')
+_C_COMMENT_PATTERNS = _compile_comment_patterns(r'//|\*')
+_COMMENT_PATTERNS_BY_EXT = {
+    **dict.fromkeys(
+        (".py", ".pyi", ".pyw", ".sh", ".rb", ".yaml", ".yml", ".toml"),
+        _HASH_COMMENT_PATTERNS,
+    ),
+    **dict.fromkeys(
+        (".js", ".jsx", ".ts", ".tsx", ".kt", ".kts", ".dart", ".java",
+         ".c", ".h", ".cpp", ".hpp", ".cs", ".go", ".swift", ".rs", ".scala"),
+        _C_COMMENT_PATTERNS,
+    ),
+}
+
+_BLANK_LINE_RE = re.compile(r'^[^\S\n]*$', re.MULTILINE)
+_BYTES_BLANK_LINE_RE = re.compile(rb'^[^\S\n]*$', re.MULTILINE)
+
+# UTF-16/32 编码的文件中换行和 ASCII 字符不是单个字节，不能按字节统计和搜索
+_WIDE_BOMS = (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE, codecs.BOM_UTF32_BE)
+
+# count_lines_many 的默认最大线程数：只有读取文件时会释放 GIL，正则统计期间线程互斥，
+# 线程多了只会增加切换开销
+_MAX_COUNT_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+
+# 按字节统计行长度时每次扫描的字节数
+_BYTES_SCAN_CHUNK = 4 * 1024 * 1024
+
+# 单词（简单的单词分割）
+_WORD_RE = re.compile(r'\b\w+\b')
+
+
+@lru_cache(maxsize=None)
+def _bytes_pattern(pattern: Pattern) -> Pattern:
+    """把只含 ASCII 的文本正则转换为等价的字节正则（供按字节扫描使用）"""
+    return re.compile(pattern.pattern.encode("ascii"), pattern.flags & (re.MULTILINE | re.IGNORECASE))
+
+
+def _check_byte_scannable(data: bytes, path: Path):
+    """按字节扫描前检查文件是否为 ASCII 兼容的编码"""
+    if data[:4].startswith(_WIDE_BOMS):
+        raise EncodingError(f"按字节处理不支持 UTF-16/UTF-32 编码的文件: {path}")
+
+
+# 文本长度达到该值时用 numpy 计算最长行长度（更短的文本直接 split 更快）
+_NUMPY_MIN_LENGTH = 4096
+
+
+def _max_line_length(content: str) -> int:
+    """
+    按 \n 划分的最长行长度（字符数），与 max(map(len, content.split("\n"))) 一致
+    
+    较长的文本转成定长编码的数组（ASCII 每字符 1 字节，否则 UTF-32 每字符 4 字节），
+    用 numpy 找出所有换行位置并对相邻位置的差值取最大值，不为每行创建字符串。
+    """
+    if len(content) < _NUMPY_MIN_LENGTH:
+        return max(map(len, content.split("\n")))
+    
+    if content.isascii():
+        chars = np.frombuffer(content.encode("ascii"), dtype=np.uint8)
+    else:
+        chars = np.frombuffer(content.encode("utf-32-le"), dtype=np.uint32)
+    # 在换行位置前后补上 -1 和文本长度，相邻位置之差减 1 即各行长度
+    bounds = np.concatenate(([-1], np.flatnonzero(chars == 0x0A), [chars.size]))
+    return int(np.diff(bounds).max()) - 1
+
+
+def _count_line_kinds(
+    content: str,
+    comment_patterns: Tuple[Pattern, Pattern] = (_COMMENT_RE, _COMMENT_LINE_RE),
+) -> Tuple[int, int, int, int]:
+    """
+    统计文本的行数（行的划分与 str.splitlines 一致）
+    
+    只有 \n 换行时用 str.count 和整段文本上的正则批量统计，不逐行进入 Python 循环。
+    
+    Args:
+        content: 文本内容
+        comment_patterns: 注释行的正则（逐行版本, 多行版本）
+    
+    Returns:
+        (总行数, 空行数, 注释行数, 最长行长度)
+    """
+    comment_re, comment_line_re = comment_patterns
+    if not content:
+        return 0, 0, 0, 0
+    
+    if _EXTRA_LINE_BREAK_RE.search(content) is None:
+        ends_with_newline = content.endswith("\n")
+        total_lines = content.count("\n") + (not ends_with_newline)
+        # 以 \n 结尾时，MULTILINE 的 ^$ 还会在文本末尾匹配一次空串，不算一行
+        blank_lines = len(_BLANK_LINE_RE.findall(content)) - ends_with_newline
+        comment_lines = len(comment_line_re.findall(content))
+        max_line_length = _max_line_length(content)
+        return total_lines, blank_lines, comment_lines, max_line_length
+    
+    lines = content.splitlines()
+    blank_lines = 0
+    comment_lines = 0
+    comment_match = comment_re.match
+    for line in lines:
+        # isspace 不会像 strip 那样为每行创建新字符串
+        if not line or line.isspace():
+            blank_lines += 1
+        elif comment_match(line):
+            comment_lines += 1
+    return len(lines), blank_lines, comment_lines, max(map(len, lines), default=0)
 
 
 def count_lines(
@@ -40,53 +170,157 @@ def count_lines(
     if not path.exists():
         raise FileNotFoundError(f"文件不存在: {path}")
     
-    content = read_file_safe(path, encoding=encoding)
-    lines = content.splitlines()
+    # 按后缀选择注释写法，例如 .py 只识别 #，.js/.kt/.dart 只识别 // 和 *
+    comment_patterns = _COMMENT_PATTERNS_BY_EXT.get(
+        path.suffix.lower(), (_COMMENT_RE, _COMMENT_LINE_RE)
+    )
     
-    total_lines = len(lines)
+    # 分块读取并累加各块的统计结果，内存占用不随文件大小增长
+    total_lines = 0
     blank_lines = 0
     comment_lines = 0
-    code_lines = 0
     max_line_length = 0
+    for block in _iter_text_blocks(path, encoding=encoding):
+        block_total, block_blank, block_comment, block_max = _count_line_kinds(block, comment_patterns)
+        total_lines += block_total
+        blank_lines += block_blank
+        comment_lines += block_comment
+        if block_max > max_line_length:
+            max_line_length = block_max
+    code_lines = total_lines - blank_lines - comment_lines
     
-    # 简单的注释检测（支持 Python、JavaScript、Kotlin、Dart 等）
-    comment_patterns = [
-        re.compile(r'^\s*#'),  # Python 单行注释
-        re.compile(r'^\s*//'),  # JavaScript/Kotlin/Dart 单行注释
-        re.compile(r'^\s*\*'),  # 多行注释中的行
-    ]
+    return {
+        "total_lines": total_lines,
+        "code_lines": code_lines,
+        "blank_lines": blank_lines,
+        "comment_lines": comment_lines,
+        "max_line_length": max_line_length,
+    }
+
+
+def _count_matches(pattern: Pattern, data) -> int:
+    """统计正则在数据中的匹配次数（不构造匹配结果列表）"""
+    return sum(1 for _ in pattern.finditer(data))
+
+
+def _scan_line_lengths(data) -> Tuple[int, int]:
+    """
+    分块扫描字节数据，统计 \n 的个数和最长行的字节长度（行尾的 \r 不计入长度）
     
-    for line in lines:
-        line_length = len(line)
-        if line_length > max_line_length:
-            max_line_length = line_length
-        
-        stripped = line.strip()
-        
-        if not stripped:
-            blank_lines += 1
+    每次只把一个块转换为 numpy 数组，跨块的行用上一块末尾的未结束长度接续。
+    
+    Returns:
+        (换行符个数, 最长行长度)
+    """
+    size = len(data)
+    newline_count = 0
+    max_line_length = 0
+    carry = 0  # 当前未结束的行在之前各块中的长度
+    prev_cr = False  # 上一块是否以 \r 结尾
+    for offset in range(0, size, _BYTES_SCAN_CHUNK):
+        chars = np.frombuffer(data, dtype=np.uint8, count=min(_BYTES_SCAN_CHUNK, size - offset), offset=offset)
+        newlines = np.flatnonzero(chars == 0x0A)
+        if newlines.size:
+            # 相邻换行位置之差减 1 即各行长度，以 \r\n 结尾的行再减去 \r
+            lengths = np.diff(newlines, prepend=-1) - 1
+            lengths[0] += carry
+            ends_with_cr = (newlines > 0) & (chars[newlines - 1] == 0x0D)
+            if newlines[0] == 0 and prev_cr:
+                ends_with_cr[0] = True
+            lengths -= ends_with_cr
+            max_line_length = max(max_line_length, int(lengths.max()))
+            newline_count += newlines.size
+            carry = chars.size - 1 - int(newlines[-1])
         else:
-            # 检查是否是注释
-            is_comment = False
-            for pattern in comment_patterns:
-                if pattern.match(line):
-                    is_comment = True
-                    break
+            carry += chars.size
+        prev_cr = bool(chars[-1] == 0x0D)
+        # 释放引用映射内存的数组，映射才能正常关闭
+        del chars
+    # 最后一行没有换行符时，其长度不减去 \r（与按 \n 划分一致）
+    return newline_count, max(max_line_length, carry)
+
+
+def count_lines_bytes(
+    file_path: str | Path,
+) -> Dict[str, int]:
+    """
+    按字节统计代码行数（用 mmap 映射文件，不解码）
+    
+    适用于 UTF-8、GBK 等 ASCII 兼容编码的大文件：行按 \n 划分（行尾的 \r 不计入长度），
+    注释的识别与 count_lines 相同，最长行长度按字节计；按固定大小的块扫描，峰值内存不随文件大小增长。
+    
+    Args:
+        file_path: 文件路径
+    
+    Returns:
+        统计结果字典，字段与 count_lines 相同
+    
+    Raises:
+        FileNotFoundError: 文件不存在
+        EncodingError: 文件为 UTF-16/UTF-32 编码
+    """
+    path = Path(file_path)
+    comment_line_re = _bytes_pattern(
+        _COMMENT_PATTERNS_BY_EXT.get(path.suffix.lower(), (_COMMENT_RE, _COMMENT_LINE_RE))[1]
+    )
+    
+    total_lines = 0
+    blank_lines = 0
+    comment_lines = 0
+    max_line_length = 0
+    with read_file_mmap(path) as data:
+        if data:
+            _check_byte_scannable(data, path)
+            
+            newline_count, max_line_length = _scan_line_lengths(data)
+            ends_with_newline = data[-1:] == b"\n"
+            total_lines = newline_count + (not ends_with_newline)
             
-            if is_comment:
-                comment_lines += 1
-            else:
-                code_lines += 1
+            # 以 \n 结尾时，MULTILINE 的 ^$ 还会在末尾匹配一次空串，不算一行；
+            # 逐个计数匹配而不是 findall，不保存匹配结果列表
+            blank_lines = _count_matches(_BYTES_BLANK_LINE_RE, data) - ends_with_newline
+            comment_lines = _count_matches(comment_line_re, data)
     
     return {
         "total_lines": total_lines,
-        "code_lines": code_lines,
+        "code_lines": total_lines - blank_lines - comment_lines,
         "blank_lines": blank_lines,
         "comment_lines": comment_lines,
         "max_line_length": max_line_length,
     }
 
 
+def count_lines_many(
+    file_paths: List[str | Path],
+    encoding: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> List[Dict[str, int]]:
+    """
+    并行统计多个文件的代码行数
+    
+    读取文件时会释放 GIL，可与其他文件的统计重叠；正则统计期间持有 GIL，
+    因此只用少量线程，主要收益来自隐藏读取文件的等待时间。
+    
+    Args:
+        file_paths: 文件路径列表
+        encoding: 文件编码
+        max_workers: 最大线程数（None 表示按 CPU 核心数自动选择）
+    
+    Returns:
+        与 file_paths 顺序一致的统计结果列表，每项与 count_lines 的返回值相同
+    
+    Raises:
+        FileNotFoundError: 文件不存在
+    """
+    paths = list(file_paths)
+    if len(paths) <= 1:
+        return [count_lines(path, encoding=encoding) for path in paths]
+    
+    workers = max_workers or min(_MAX_COUNT_WORKERS, len(paths))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda path: count_lines(path, encoding=encoding), paths))
+
+
 def analyze_file_size(
     file_path: str | Path,
 ) -> Dict[str, Any]:
@@ -172,7 +406,6 @@ def search_text(
         raise FileNotFoundError(f"文件不存在: {path}")
     
     content = read_file_safe(path, encoding=encoding)
-    lines = content.splitlines()
     
     matches = []
     
@@ -189,8 +422,41 @@ def search_text(
         else:
             pattern = re.compile(re.escape(search_pattern), re.IGNORECASE)
     
+    # 普通文本搜索（不含换行的非空文本，匹配不会跨行）且只有 \n 换行时，在整段文本上只调用一次
+    # finditer，再用行索引二分查找匹配所在的行；正则的 ^、$ 等语义依赖逐行匹配，仍逐行搜索
+    if (
+        not regex
+        and search_pattern
+        and "\n" not in search_pattern
+        and not _EXTRA_LINE_BREAK_RE.search(search_pattern)
+        and not _EXTRA_LINE_BREAK_RE.search(content)
+    ):
+        line_starts = _line_starts(content)
+        line_num = 0
+        line_start = 0
+        line_end = 0
+        line = ""
+        for match in pattern.finditer(content):
+            match_start = match.start()
+            if match_start >= line_end:
+                # 换到新的一行时才切出行内容，同一行的多个匹配共用
+                line_num = bisect_right(line_starts, match_start)
+                line_start = line_starts[line_num - 1]
+                line_end = line_starts[line_num] - 1 if line_num < len(line_starts) else len(content)
+                line = content[line_start:line_end]
+            start = match_start - line_start
+            matches.append({
+                "line_number": line_num,
+                "column": start + 1,
+                "match_text": match.group(),
+                "line_content": line,
+                "start": start,
+                "end": match.end() - line_start,
+            })
+        return matches
+    
     # 搜索
-    for line_num, line in enumerate(lines, 1):
+    for line_num, line in enumerate(content.splitlines(), 1):
         for match in pattern.finditer(line):
             matches.append({
                 "line_number": line_num,
@@ -204,6 +470,86 @@ def search_text(
     return matches
 
 
+def search_text_bytes(
+    file_path: str | Path,
+    search_pattern: str | bytes | Pattern,
+    regex: bool = False,
+    case_sensitive: bool = False,
+    encoding: str = "utf-8",
+) -> List[Dict[str, Any]]:
+    """
+    按字节在文件中搜索文本（用 mmap 映射文件，正则直接在映射内存上查找，不解码整个文件）
+    
+    适用于 UTF-8、GBK 等 ASCII 兼容编码的大文件。与 search_text 不同：正则在整个文件上匹配
+    （^、$ 需配合 re.MULTILINE），不区分大小写只对 ASCII 字母生效，列号和 start/end 按字节计。
+    只有匹配所在的行会被解码。
+    
+    Args:
+        file_path: 文件路径
+        search_pattern: 搜索模式（字符串、字节串或字节正则表达式）
+        regex: 是否使用正则表达式
+        case_sensitive: 是否区分大小写
+        encoding: 文件编码（用于编码搜索文本和解码匹配结果）
+    
+    Returns:
+        匹配结果列表，字段与 search_text 相同
+    
+    Raises:
+        FileNotFoundError: 文件不存在
+        EncodingError: 文件为 UTF-16/UTF-32 编码
+    """
+    path = Path(file_path)
+    
+    # 准备搜索模式
+    if isinstance(search_pattern, str):
+        search_pattern = search_pattern.encode(encoding)
+    if isinstance(search_pattern, bytes):
+        flags = 0 if case_sensitive else re.IGNORECASE
+        pattern = re.compile(search_pattern if regex else re.escape(search_pattern), flags)
+    else:
+        pattern = search_pattern
+    
+    matches = []
+    with read_file_mmap(path) as data:
+        if not data:
+            return matches
+        _check_byte_scannable(data, path)
+        
+        chars = np.frombuffer(data, dtype=np.uint8)
+        line_num = 1
+        counted = 0
+        line_start = 0
+        line_end = -1
+        line = ""
+        for match in pattern.finditer(data):
+            match_start = match.start()
+            if match_start > line_end:
+                # 换到新的一行：统计跳过的换行数得到行号，只解码匹配所在的行
+                line_start = data.rfind(b"\n", 0, match_start) + 1
+                line_num += int(np.count_nonzero(chars[counted:line_start] == 0x0A))
+                counted = line_start
+                line_end = data.find(b"\n", match_start)
+                if line_end == -1:
+                    line_end = len(data)
+                line_bytes = data[line_start:line_end]
+                if line_bytes.endswith(b"\r"):
+                    line_bytes = line_bytes[:-1]
+                line = line_bytes.decode(encoding, errors="replace")
+            start = match_start - line_start
+            matches.append({
+                "line_number": line_num,
+                "column": start + 1,
+                "match_text": match.group().decode(encoding, errors="replace"),
+                "line_content": line,
+                "start": start,
+                "end": match.end() - line_start,
+            })
+        # 映射关闭前释放引用映射内存的数组
+        del chars
+    
+    return matches
+
+
 def count_words(
     file_path: str | Path,
     encoding: Optional[str] = None,
@@ -231,19 +577,22 @@ def count_words(
     if not path.exists():
         raise FileNotFoundError(f"文件不存在: {path}")
     
-    content = read_file_safe(path, encoding=encoding)
-    
-    # 统计字符
-    total_chars = len(content)
-    total_chars_no_spaces = len(content.replace(" ", "").replace("\n", "").replace("\t", ""))
+    # 分块读取并增量统计（块以换行结尾，单词不会被拆开）
+    total_chars = 0
+    total_chars_no_spaces = 0
+    word_freq = Counter()
+    for block in _iter_text_blocks(path, encoding=encoding):
+        # 统计字符
+        total_chars += len(block)
+        total_chars_no_spaces += len(block) - block.count(" ") - block.count("\n") - block.count("\t")
+        
+        # 提取单词（简单的单词分割）
+        word_freq.update(_WORD_RE.findall(block.lower()))
     
-    # 提取单词（简单的单词分割）
-    words = re.findall(r'\b\w+\b', content.lower())
-    total_words = len(words)
-    unique_words = len(set(words))
+    total_words = sum(word_freq.values())
+    unique_words = len(word_freq)
     
     # 统计单词频率
-    word_freq = Counter(words)
     top_words = dict(word_freq.most_common(10))
     
     return {
@@ -2,15 +2,42 @@
 文件内容处理工具
 """
 
+import codecs
+import mmap
+import os
 import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, Optional, Callable, Pattern, Literal
+from typing import Iterator, List, Optional, Callable, Pattern, Literal, Union
 import chardet
 
 from .exceptions import FileOperationError, EncodingError
 from .safe_writer import SafeFileWriter
 
 
+# 分块读取文本时每块的大致字符数（同时作为文件缓冲区大小）
+_TEXT_BLOCK_SIZE = 1024 * 1024
+
+# 按文本内容缓存的函数，每个缓存中文本的总字符数上限
+_CONTENT_CACHE_MAX_CHARS = 8 * 1024 * 1024
+
+# chardet 增量检测时每次送入的字节数
+_DETECT_CHUNK_SIZE = 64 * 1024
+
+# BOM 与对应编码（UTF-32 LE 的 BOM 以 UTF-16 LE 的 BOM 开头，需先判断）
+_BOM_ENCODINGS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
 def read_file_safe(
     file_path: str | Path,
     encoding: Optional[str] = None,
@@ -39,26 +66,283 @@ def read_file_safe(
     if not path.is_file():
         raise FileOperationError(f"路径不是文件: {path}")
     
-    # 自动检测编码
+    # 只读取一次文件：自动检测编码时直接在读取到的字节上检测并解码
+    try:
+        data = path.read_bytes()
+        if encoding is None:
+            text = _decode_auto(data, errors)
+        else:
+            text = data.decode(encoding, errors)
+    except UnicodeDecodeError as e:
+        raise EncodingError(f"文件编码错误: {e}")
+    except Exception as e:
+        raise FileOperationError(f"读取文件失败: {e}")
+    
+    # 与文本模式读取一致的换行转换（\r\n、\r 转为 \n）
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+@contextmanager
+def read_file_mmap(file_path: str | Path) -> Iterator[Union[mmap.mmap, bytes]]:
+    """
+    以只读 mmap 方式映射文件，供直接按字节扫描的操作使用（不解码、不复制整个文件）
+    
+    映射的内容由操作系统按需换入，re 和 numpy 都可以直接在上面查找；空文件无法映射，
+    此时得到 b""。离开上下文时关闭映射，在此之前需释放引用映射内存的对象（如 numpy 数组）。
+    
+    使用示例：
+        with read_file_mmap("app.log") as data:
+            data.find(b"ERROR")
+    
+    Args:
+        file_path: 文件路径
+    
+    Yields:
+        只读的 mmap 对象（空文件为 b""）
+    
+    Raises:
+        FileNotFoundError: 文件不存在
+        FileOperationError: 读取失败
+    """
+    path = Path(file_path)
+    
+    if not path.exists():
+        raise FileNotFoundError(f"文件不存在: {path}")
+    
+    if not path.is_file():
+        raise FileOperationError(f"路径不是文件: {path}")
+    
+    try:
+        f = open(path, "rb")
+    except OSError as e:
+        raise FileOperationError(f"读取文件失败: {e}")
+    
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise FileOperationError(f"读取文件失败: {e}")
+        with mm:
+            yield mm
+
+
+def _bom_encoding(head: bytes) -> Optional[str]:
+    """根据 BOM 判断编码，没有 BOM 时返回 None"""
+    for bom, encoding in _BOM_ENCODINGS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+
+def _chardet_encoding(chunks) -> str:
+    """用 chardet 增量检测编码（足够确定时提前结束），无法检测时返回 utf-8"""
+    try:
+        detector = chardet.UniversalDetector()
+        for chunk in chunks:
+            detector.feed(chunk)
+            if detector.done:
+                break
+        detector.close()
+        return detector.result.get("encoding") or "utf-8"
+    except Exception:
+        return "utf-8"
+
+
+def _decode_auto(data: bytes, errors: str = "strict") -> str:
+    """
+    自动检测编码并解码
+    
+    依次按 BOM、UTF-8 判断（大部分文件到此即可确定），都不符合时才用 chardet 检测。
+    """
+    encoding = _bom_encoding(data[:4])
     if encoding is None:
         try:
-            with open(path, "rb") as f:
-                raw_data = f.read()
-                detected = chardet.detect(raw_data)
-                encoding = detected.get("encoding", "utf-8")
-                if encoding is None:
-                    encoding = "utf-8"
-        except Exception:
-            encoding = "utf-8"
+            return data.decode("utf-8")
+        except UnicodeDecodeError:
+            view = memoryview(data)
+            encoding = _chardet_encoding(
+                view[i:i + _DETECT_CHUNK_SIZE] for i in range(0, len(data), _DETECT_CHUNK_SIZE)
+            )
+    return data.decode(encoding, errors)
+
+
+def _detect_encoding(path: Path) -> str:
+    """
+    检测文件编码，无法检测时返回 utf-8
+    
+    依次按 BOM、UTF-8 判断（分块校验整个文件，内存占用固定），都不符合时才用 chardet 检测。
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(_DETECT_CHUNK_SIZE)
+            encoding = _bom_encoding(head)
+            if encoding is not None:
+                return encoding
+            
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            try:
+                chunk = head
+                while chunk:
+                    decoder.decode(chunk)
+                    chunk = f.read(_TEXT_BLOCK_SIZE)
+                decoder.decode(b"", final=True)
+                return "utf-8"
+            except UnicodeDecodeError:
+                pass
+            
+            f.seek(0)
+            return _chardet_encoding(iter(lambda: f.read(_DETECT_CHUNK_SIZE), b""))
+    except Exception:
+        return "utf-8"
+
+
+def _iter_text_blocks(
+    file_path: str | Path,
+    encoding: Optional[str] = None,
+    errors: str = "strict",
+    block_size: int = _TEXT_BLOCK_SIZE,
+) -> Iterator[str]:
+    """
+    分块读取文本文件（与 read_file_safe 的编码检测、换行转换和异常一致）
+    
+    每块由若干完整的行组成（以换行结尾，文件末尾的块除外），内存占用与块大小相当，
+    不随文件大小增长；按行统计时各块的结果可以直接相加。
+    
+    Yields:
+        约 block_size 个字符的文本块
+    
+    Raises:
+        FileNotFoundError: 文件不存在
+        EncodingError: 编码错误
+    """
+    path = Path(file_path)
+    
+    if not path.exists():
+        raise FileNotFoundError(f"文件不存在: {path}")
+    
+    if not path.is_file():
+        raise FileOperationError(f"路径不是文件: {path}")
+    
+    if encoding is None:
+        encoding = _detect_encoding(path)
     
     try:
-        return path.read_text(encoding=encoding, errors=errors)
+        with open(path, "r", encoding=encoding, errors=errors, buffering=_TEXT_BLOCK_SIZE) as f:
+            while True:
+                lines = f.readlines(block_size)
+                if not lines:
+                    break
+                yield "".join(lines)
     except UnicodeDecodeError as e:
         raise EncodingError(f"文件编码错误: {e}")
-    except Exception as e:
+    except (OSError, LookupError) as e:
         raise FileOperationError(f"读取文件失败: {e}")
 
 
+def _content_cache(
+    max_chars: int = _CONTENT_CACHE_MAX_CHARS,
+    size_of_result: bool = False,
+) -> Callable[[Callable], Callable]:
+    """
+    按文本内容（及其余参数）缓存函数结果的装饰器，淘汰最近最少使用的结果
+    
+    缓存键持有整个文本，长时间运行的服务中按条目数限制仍可能占用大量内存，
+    因此按缓存中文本的总字符数限制缓存大小；单个超过上限的文本不缓存。
+    
+    Args:
+        max_chars: 缓存中文本的总字符数上限
+        size_of_result: 为 True 时按返回的文本（而不是第一个参数）计算大小，
+            用于缓存读取得到的文件内容
+    
+    Returns:
+        装饰器；size_of_result 为 False 时被装饰函数的第一个参数必须是文本内容
+    """
+    def decorator(func: Callable) -> Callable:
+        cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        lock = threading.Lock()
+        total_chars = 0
+        
+        @wraps(func)
+        def wrapper(content, *args):
+            nonlocal total_chars
+            key = (content, *args)
+            with lock:
+                if key in cache:
+                    cache.move_to_end(key)
+                    return cache[key][0]
+            
+            result = func(content, *args)
+            size = len(result) if size_of_result else len(content)
+            if size <= max_chars:
+                with lock:
+                    if key not in cache:
+                        cache[key] = (result, size)
+                        total_chars += size
+                        while total_chars > max_chars:
+                            _, (_, old_size) = cache.popitem(last=False)
+                            total_chars -= old_size
+            return result
+        
+        def cache_clear() -> None:
+            nonlocal total_chars
+            with lock:
+                cache.clear()
+                total_chars = 0
+        
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+
+# 除 \n 外 str.splitlines 也会断行的字符；文本中出现这些字符时按 splitlines 划分行
+_EXTRA_LINE_BREAK_RE = re.compile('[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+
+
+@_content_cache()
+def _line_starts(content: str) -> List[int]:
+    """每一行起始位置的索引（按 \n 划分），按内容缓存（限制缓存的文本总长度）"""
+    line_starts = [0]
+    line_starts.extend(match.end() for match in re.finditer("\n", content))
+    return line_starts
+
+
+@_content_cache()
+def _has_extra_line_breaks(content: str) -> bool:
+    """文本中是否有 \n 以外的 splitlines 断行字符，按内容缓存"""
+    return _EXTRA_LINE_BREAK_RE.search(content) is not None
+
+
+def _line_count(content: str) -> int:
+    """文本的行数，与 len(content.splitlines()) 一致"""
+    if _has_extra_line_breaks(content):
+        return len(content.splitlines())
+    return content.count("\n") + (bool(content) and not content.endswith("\n"))
+
+
+def _line_offset(content: str, index: int) -> int:
+    """
+    第 index 行（从0开始）在文本中的起始位置，行的划分与 str.splitlines(keepends=True) 一致
+    
+    超出行数时返回文本长度，因此 content[:_line_offset(content, i)] 等价于
+    "".join(content.splitlines(keepends=True)[:i])，拼接文本时不必构造行列表。
+    """
+    if _has_extra_line_breaks(content):
+        lines = content.splitlines(keepends=True)
+        return sum(map(len, lines[:index]))
+    line_starts = _line_starts(content)
+    return line_starts[index] if index < len(line_starts) else len(content)
+
+
+def _line_slice(content: str, start_idx: int, end_idx: int) -> str:
+    """第 start_idx 到 end_idx 行（从0开始，不含 end_idx）的文本，等价于拼接 splitlines(keepends=True) 的切片"""
+    return content[_line_offset(content, start_idx):_line_offset(content, end_idx)]
+
+
 def write_file_safe(
     file_path: str | Path,
     content: str,
@@ -125,15 +409,18 @@ def replace_content(
             pattern = old_text
         new_content, replace_count = pattern.subn(new_text, content, count=count)
     else:
+        # 先统计出现次数，没有匹配时直接返回，不再为替换扫描和复制整个文本
+        replace_count = content.count(old_text)
+        if replace_count == 0:
+            return 0
         if count == 0:
             new_content = content.replace(old_text, new_text)
-            replace_count = content.count(old_text)
         else:
             new_content = content.replace(old_text, new_text, count)
-            replace_count = min(count, content.count(old_text))
+            replace_count = min(count, replace_count)
     
-    # 写入文件
-    if replace_count > 0:
+    # 写入文件（替换前后内容相同时不必重写文件和创建备份）
+    if replace_count > 0 and new_content != content:
         writer = SafeFileWriter(path, backup=True)
         writer.write(new_content)
     
@@ -163,19 +450,22 @@ def merge_files(
         FileOperationError: 合并失败
     """
     output = Path(output_path)
-    contents = []
+    paths = [Path(file_path) for file_path in file_paths]
     
-    for file_path in file_paths:
-        path = Path(file_path)
+    for path in paths:
         if not path.exists():
             raise FileNotFoundError(f"文件不存在: {path}")
-        content = read_file_safe(path, encoding=encoding)
-        contents.append(content)
     
-    # 写入合并后的内容
-    merged_content = separator.join(contents)
+    # 逐个源文件分块读取并直接写入临时文件，不在内存中拼接所有文件的内容
     writer = SafeFileWriter(output, encoding=encoding, backup=False)
-    writer.write(merged_content)
+    with writer.atomic_write() as f:
+        # 与一次写入全部内容一致：UTF-16 等带 BOM 的编码在合并结果为空时也写出 BOM
+        f.write("")
+        for i, path in enumerate(paths):
+            if i:
+                f.write(separator)
+            for block in _iter_text_blocks(path, encoding=encoding):
+                f.write(block)
     
     return output
 
@@ -212,53 +502,64 @@ def split_file(
     
     output.mkdir(parents=True, exist_ok=True)
     
-    content = read_file_safe(path, encoding=encoding)
     output_files = []
     
+    def write_part(part_num: int, part_content: str):
+        output_file = output / f"{path.stem}_part{part_num}{path.suffix}"
+        writer = SafeFileWriter(output_file, encoding=encoding, backup=False)
+        writer.write(part_content)
+        output_files.append(output_file)
+    
     if split_by == "lines":
-        lines = content.splitlines(keepends=True)
         chunk_size = int(split_value)
-        base_name = path.stem
-        extension = path.suffix
+        if chunk_size <= 0:
+            raise FileOperationError(f"分割行数必须大于0: {chunk_size}")
         
-        for i in range(0, len(lines), chunk_size):
-            chunk = lines[i:i + chunk_size]
-            chunk_content = "".join(chunk)
-            output_file = output / f"{base_name}_part{i // chunk_size + 1}{extension}"
-            writer = SafeFileWriter(output_file, encoding=encoding, backup=False)
-            writer.write(chunk_content)
-            output_files.append(output_file)
+        # 分块读取并逐行迭代（块以换行结尾，各块拆出的行与整个文本 splitlines 的结果一致），
+        # 内存占用与单个分割文件相当，不随源文件大小增长
+        lines = chain.from_iterable(
+            block.splitlines(keepends=True)
+            for block in _iter_text_blocks(path, encoding=encoding)
+        )
+        part_num = 1
+        while True:
+            chunk = list(islice(lines, chunk_size))
+            if not chunk:
+                break
+            write_part(part_num, "".join(chunk))
+            part_num += 1
     
     elif split_by == "size":
         size_limit = int(split_value)
-        base_name = path.stem
-        extension = path.suffix
-        content_bytes = content.encode(encoding)
+        if size_limit <= 0:
+            raise FileOperationError(f"分割大小必须大于0: {size_limit}")
         
+        # 分块读取，用增量编码器（整个文件只写一次 BOM）编码后按字节数切分，不编码整个文件
+        encoder = codecs.getincrementalencoder(encoding)()
+        buffer = bytearray()
         part_num = 1
-        offset = 0
-        while offset < len(content_bytes):
-            chunk_bytes = content_bytes[offset:offset + size_limit]
-            chunk_content = chunk_bytes.decode(encoding, errors="replace")
-            output_file = output / f"{base_name}_part{part_num}{extension}"
-            writer = SafeFileWriter(output_file, encoding=encoding, backup=False)
-            writer.write(chunk_content)
-            output_files.append(output_file)
-            offset += size_limit
-            part_num += 1
+        for block in chain(_iter_text_blocks(path, encoding=encoding), [None]):
+            if block is None:
+                buffer += encoder.encode("", final=True)
+            else:
+                buffer += encoder.encode(block)
+            
+            offset = 0
+            while len(buffer) - offset >= size_limit or (block is None and offset < len(buffer)):
+                chunk_bytes = bytes(buffer[offset:offset + size_limit])
+                write_part(part_num, chunk_bytes.decode(encoding, errors="replace"))
+                offset += size_limit
+                part_num += 1
+            del buffer[:offset]
     
     elif split_by == "pattern":
+        content = read_file_safe(path, encoding=encoding)
         pattern = re.compile(str(split_value))
         parts = pattern.split(content)
-        base_name = path.stem
-        extension = path.suffix
         
         for i, part in enumerate(parts, 1):
             if part.strip():  # 跳过空部分
-                output_file = output / f"{base_name}_part{i}{extension}"
-                writer = SafeFileWriter(output_file, encoding=encoding, backup=False)
-                writer.write(part)
-                output_files.append(output_file)
+                write_part(i, part)
     
     return output_files
 
@@ -350,18 +651,16 @@ def delete_lines(
         raise FileNotFoundError(f"文件不存在: {path}")
     
     content = read_file_safe(path, encoding=encoding)
-    lines = content.splitlines(keepends=True)
     
     if end_line is None:
         end_line = start_line
     
     # 调整索引（从1开始转为从0开始）
     start_idx = max(0, start_line - 1)
-    end_idx = min(len(lines), end_line)
+    end_idx = max(0, end_line)
     
-    # 删除指定范围的行
-    new_lines = lines[:start_idx] + lines[end_idx:]
-    new_content = "".join(new_lines)
+    # 按行的起始位置直接拼接原文本，删除指定范围的行
+    new_content = content[:_line_offset(content, start_idx)] + content[_line_offset(content, end_idx):]
     
     writer = SafeFileWriter(path, encoding=encoding, backup=True)
     writer.write(new_content)
@@ -2,9 +2,11 @@
 基础文件操作工具
 """
 
+import errno
 import os
 import shutil
 import stat
+import sys
 from pathlib import Path
 from typing import Optional, Dict, Any
 from datetime import datetime
@@ -16,6 +18,82 @@ from .exceptions import (
 # FileNotFoundError 和 PermissionError 是 Python 内置异常，直接使用
 
 
+# 用户态复制的缓冲区大小
+_COPY_BUFSIZE = 1024 * 1024
+
+# 零拷贝系统调用不支持当前文件组合时返回的错误码，遇到后改用下一种复制方式
+_ZERO_COPY_FALLBACK_ERRNOS = {
+    errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EBADF,
+    getattr(errno, "EOPNOTSUPP", errno.EINVAL), getattr(errno, "ENOTSUP", errno.EINVAL),
+    getattr(errno, "ENOTSOCK", errno.EINVAL),
+}
+
+# 只在 Linux 上用 sendfile 复制普通文件（与 shutil 一致；macOS 等平台的 sendfile 只能写入套接字）
+_USE_SENDFILE = hasattr(os, "sendfile") and sys.platform.startswith("linux")
+
+
+def _fastcopy(src: Path, dst: Path, preserve_metadata: bool = True) -> None:
+    """
+    复制文件内容，并按需保留元数据（等同 shutil.copy2 / shutil.copy）
+    
+    依次尝试 os.copy_file_range（内核内 / CoW / 服务端复制）、os.sendfile（仅 Linux），
+    最后回退到 1 MB 缓冲区的 readinto 循环；某种方式中途不可用时从已复制的位置继续。
+    
+    Raises:
+        shutil.SameFileError: 源文件与目标文件是同一个文件
+    """
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src} 和 {dst} 是同一个文件")
+    
+    with open(src, "rb", buffering=0) as fsrc, open(dst, "wb", buffering=0) as fdst:
+        in_fd = fsrc.fileno()
+        out_fd = fdst.fileno()
+        size = os.fstat(in_fd).st_size
+        copied = 0
+        
+        if hasattr(os, "copy_file_range"):
+            try:
+                while copied < size:
+                    sent = os.copy_file_range(in_fd, out_fd, size - copied, copied, copied)
+                    if sent == 0:
+                        break
+                    copied += sent
+            except OSError as e:
+                if e.errno not in _ZERO_COPY_FALLBACK_ERRNOS:
+                    raise
+        
+        if copied < size and _USE_SENDFILE:
+            try:
+                os.lseek(out_fd, copied, os.SEEK_SET)
+                while copied < size:
+                    sent = os.sendfile(out_fd, in_fd, copied, size - copied)
+                    if sent == 0:
+                        break
+                    copied += sent
+            except OSError as e:
+                if e.errno not in _ZERO_COPY_FALLBACK_ERRNOS:
+                    raise
+        
+        # 用户态复制剩余部分（也处理 st_size 为 0 但实际有内容的特殊文件）
+        os.lseek(in_fd, copied, os.SEEK_SET)
+        os.lseek(out_fd, copied, os.SEEK_SET)
+        buf = memoryview(bytearray(_COPY_BUFSIZE))
+        while True:
+            n = fsrc.readinto(buf)
+            if not n:
+                break
+            view = buf[:n]
+            while view:
+                written = fdst.write(view)
+                view = view[written:]
+        fdst.truncate()
+    
+    if preserve_metadata:
+        shutil.copystat(src, dst)
+    else:
+        shutil.copymode(src, dst)
+
+
 def copy_file(
     source: str | Path,
     destination: str | Path,
@@ -55,10 +133,14 @@ def copy_file(
     dest_path.parent.mkdir(parents=True, exist_ok=True)
     
     try:
-        if preserve_metadata:
-            shutil.copy2(source_path, dest_path)
+        if dest_path.is_dir():
+            # 目标是已存在的目录时保持 shutil 的行为（复制到该目录下）
+            if preserve_metadata:
+                shutil.copy2(source_path, dest_path)
+            else:
+                shutil.copy(source_path, dest_path)
         else:
-            shutil.copy(source_path, dest_path)
+            _fastcopy(source_path, dest_path, preserve_metadata=preserve_metadata)
         return dest_path
     except PermissionError as e:
         raise PermissionError(f"权限不足，无法复制文件: {e}")
@@ -5,13 +5,13 @@
 """
 
 import os
-import shutil
 import tempfile
 from pathlib import Path
 from typing import Optional, Literal
 from contextlib import contextmanager
 
 from .exceptions import FileOperationError, BackupError
+from .file_utils import _fastcopy
 
 
 class SafeFileWriter:
@@ -58,7 +58,7 @@ class SafeFileWriter:
         backup_path = self.file_path.parent / f"{self.file_path.name}.backup.{int(timestamp)}"
         
         try:
-            shutil.copy2(self.file_path, backup_path)
+            _fastcopy(self.file_path, backup_path)
             return backup_path
         except Exception as e:
             raise BackupError(f"创建备份失败: {e}")
@@ -113,9 +113,11 @@ class SafeFileWriter:
         try:
             # 写入临时文件
             if mode == "append" and self.file_path.exists():
-                # 追加模式：先读取原内容
-                original_content = self.file_path.read_text(encoding=self.encoding)
-                self.temp_path.write_text(original_content + content, encoding=self.encoding)
+                # 追加模式：按字节复制原文件到临时文件后在末尾追加，不解码和重新编码原内容
+                # （以追加方式打开时文本流不会再次写入 BOM）
+                _fastcopy(self.file_path, self.temp_path, preserve_metadata=False)
+                with open(self.temp_path, "a", encoding=self.encoding) as f:
+                    f.write(content)
             else:
                 # 覆盖模式
                 self.temp_path.write_text(content, encoding=self.encoding)
@@ -206,7 +208,7 @@ class SafeFileWriter:
             raise BackupError("备份文件不存在")
         
         try:
-            shutil.copy2(self.backup_path, self.file_path)
+            _fastcopy(self.backup_path, self.file_path)
             if self._original_stat:
                 self._preserve_metadata(self.backup_path, self.file_path)
         except Exception as e:
@@ -226,10 +228,11 @@ class SafeFileWriter:
             # 确保目录存在
             self.file_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # 创建备份
-            if self.backup and self.file_path.exists():
-                self.backup_path = self._create_backup()
+            # 保存原文件信息并创建备份（与 write 一致，不备份时也保留原文件的元数据）
+            if self.file_path.exists():
                 self._original_stat = self.file_path.stat()
+                if self.backup:
+                    self.backup_path = self._create_backup()
             
             # 创建临时文件
             self.temp_path = self._get_temp_path()
@@ -819,7 +819,7 @@ def get_node_detail_info(
                         }
                     else:
                         # 即使不是API，也保存页面内容
-                        decoded_content = page_data.get("decoded_content")
+                        decoded_content = client.get_decoded_content(page_data)
                         if decoded_content:
                             print(f"[DEBUG] 页面 {page_id_str} 是普通页面，已保存内容")
                             page_info["page_content"] = decoded_content